@@ -0,0 +1,26 @@
+import argparse
+
+
+def add_database_arguments(
+    parser: argparse.ArgumentParser, default: str | None = None
+):
+    """Add `--url`, the database to benchmark against, and `--reset`."""
+    parser.add_argument(
+        '--url',
+        default=default,
+        help='database to seed; all of its tables are dropped first',
+    )
+    parser.add_argument(
+        '--reset',
+        action='store_true',
+        help='confirm that the tables of --url may be dropped',
+    )
+
+
+def parse_args(parser: argparse.ArgumentParser) -> argparse.Namespace:
+    """Parse the arguments, refusing to wipe any database but the default
+    scratch one without `--reset`."""
+    args = parser.parse_args()
+    if args.url != parser.get_default('url') and not args.reset:
+        parser.error('--url is wiped before seeding; pass --reset to confirm')
+    return args
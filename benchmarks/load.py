@@ -0,0 +1,341 @@
+"""Load test every router in-process and compare against a baseline.
+
+Seeds one user per client with `--todos` todos each, into a temporary
+SQLite database unless `--url` is given, in which case every table there
+is dropped first and `--reset` must be passed too. It then drives the
+ASGI app through an async HTTP client, endpoint by endpoint, with
+`--concurrency` clients sharing `--requests` requests, `--rounds` times
+over. Nothing but the app runs in between: no server, no sockets, so the
+numbers move with the code in `fastapi_zero` and the database it talks
+to. The app's own settings apply, e.g. `FAST_JSON_RESPONSES=true`.
+
+Requests vary their parameters (todo ids, filters, offsets) so that the
+response cache misses wherever a real client would. Reports throughput
+and p50/p95/p99 latency per endpoint as JSON. With `--baseline`, also
+reports the relative change of each against a previous `--output` and
+exits with status 1 when throughput dropped, or p95 rose, by more than
+`--tolerance`. A single run on a busy machine easily moves by that much:
+compare runs made on the same machine, and raise `--rounds` if needed.
+
+    python -m benchmarks.load --output baseline.json
+    python -m benchmarks.load --baseline baseline.json
+    python -m benchmarks.load --url postgresql+psycopg://... --reset
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from statistics import median, quantiles
+from time import perf_counter
+
+import httpx
+from sqlalchemy import insert
+
+from benchmarks import add_database_arguments, parse_args
+from fastapi_zero import database
+from fastapi_zero.app import app
+from fastapi_zero.models import Todo, TodoState, User, table_registry
+from fastapi_zero.security import get_password_hash
+
+PASSWORD = 'benchmark'
+STATES = [state.value for state in TodoState]
+LIMIT = 10
+
+
+@dataclass
+class Client:
+    """A simulated client, logged in as its own user."""
+
+    user_id: int
+    email: str
+    todo_ids: list[int]
+    headers: dict = field(default_factory=dict)
+    created: list[int] = field(default_factory=list)
+
+
+async def seed(engine, clients: int, todos: int) -> list[Client]:
+    password_hash = get_password_hash(PASSWORD)
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.drop_all)
+        await conn.run_sync(table_registry.metadata.create_all)
+
+        seeded = []
+        for n in range(clients):
+            email = f'bench{n}@test.com'
+            user_id = await conn.scalar(
+                insert(User)
+                .values(
+                    username=f'bench{n}',
+                    email=email,
+                    password_hash=password_hash,
+                )
+                .returning(User.id)
+            )
+            todo_ids = await conn.scalars(
+                insert(Todo).returning(Todo.id),
+                [
+                    {
+                        'title': f'Todo {i}',
+                        'description': f'Description {i}',
+                        'state': STATES[i % len(STATES)],
+                        'user_id': user_id,
+                    }
+                    for i in range(todos)
+                ],
+            )
+            seeded.append(Client(user_id, email, sorted(todo_ids)))
+    return seeded
+
+
+async def login(http, client, i):
+    return await http.post(
+        '/auth/login', data={'username': client.email, 'password': PASSWORD}
+    )
+
+
+async def create_user(http, client, i):
+    return await http.post(
+        '/users/',
+        json={
+            'username': f'new{client.user_id}-{i}',
+            'email': f'new{client.user_id}-{i}@test.com',
+            'password': PASSWORD,
+        },
+    )
+
+
+async def list_users(http, client, i):
+    return await http.get('/users/', params={'skip': i, 'limit': LIMIT})
+
+
+async def find_user(http, client, i):
+    return await http.get(f'/users/{client.user_id}')
+
+
+async def create_todo(http, client, i):
+    response = await http.post(
+        '/todos/',
+        json={'title': f'New {i}', 'description': 'Created under load'},
+        headers=client.headers,
+    )
+    if response.status_code == HTTPStatus.CREATED:
+        client.created.append(response.json()['id'])
+    return response
+
+
+async def find_todo(http, client, i):
+    todo_id = client.todo_ids[i % len(client.todo_ids)]
+    return await http.get(f'/todos/{todo_id}', headers=client.headers)
+
+
+async def list_todos_filtered(http, client, i):
+    return await http.get(
+        '/todos/',
+        params={'title': f'odo {i}', 'state': STATES[i % len(STATES)]},
+        headers=client.headers,
+    )
+
+
+async def list_todos_deep(http, client, i):
+    half = len(client.todo_ids) // 2
+    return await http.get(
+        '/todos/',
+        params={'skip': half + i % (half - LIMIT), 'limit': LIMIT},
+        headers=client.headers,
+    )
+
+
+async def todo_stats(http, client, i):
+    return await http.get('/todos/stats', headers=client.headers)
+
+
+async def update_todo(http, client, i):
+    todo_id = client.todo_ids[i % len(client.todo_ids)]
+    return await http.put(
+        f'/todos/{todo_id}',
+        json={'state': STATES[i % len(STATES)]},
+        headers=client.headers,
+    )
+
+
+async def delete_todo(http, client, i):
+    # Nothing to delete yet if this client's POST /todos/ requests failed
+    if not client.created:
+        return None
+    return await http.delete(
+        f'/todos/{client.created.pop()}', headers=client.headers
+    )
+
+
+# Endpoint: (request, expected status, share of `--requests`). Those
+# hashing a password are bound by its cost, so they get a tenth of the
+# requests. Run in this order: `DELETE /todos/{todo_id}` removes the todos
+# created by `POST /todos/`, so both must get the same number of requests.
+SCENARIOS = {
+    'POST /auth/login': (login, 200, 0.1),
+    'POST /users/': (create_user, 201, 0.1),
+    'GET /users/': (list_users, 200, 1),
+    'GET /users/{user_id}': (find_user, 200, 1),
+    'POST /todos/': (create_todo, 201, 1),
+    'GET /todos/{todo_id}': (find_todo, 200, 1),
+    'GET /todos/?title&state': (list_todos_filtered, 200, 1),
+    'GET /todos/?skip (deep)': (list_todos_deep, 200, 1),
+    'GET /todos/stats': (todo_stats, 200, 1),
+    'PUT /todos/{todo_id}': (update_todo, 200, 1),
+    'DELETE /todos/{todo_id}': (delete_todo, 204, 1),
+}
+
+
+async def run(  # noqa: PLR0913, PLR0917
+    http, clients, request, expected: int, requests: int, rounds: int
+) -> dict:
+    """Send `requests` requests, `rounds` times over. Throughput is the
+    median round's; percentiles are taken over every request. Requests
+    that had nothing to act on are skipped and only counted."""
+    latencies = []
+    throughputs = []
+    errors = 0
+    skipped = 0
+
+    # Clients split the requests evenly, so each deletes as many todos as
+    # it created. Indexes keep counting across rounds so repeated
+    # requests don't turn into response cache hits.
+    async def worker(offset, n, client):
+        nonlocal errors, skipped
+        for i in range(offset + n, offset + requests, len(clients)):
+            started = perf_counter()
+            response = await request(http, client, i)
+            if response is None:
+                skipped += 1
+                continue
+            latencies.append(perf_counter() - started)
+            errors += response.status_code != expected
+
+    for offset in range(0, rounds * requests, requests):
+        sent = len(latencies)
+        started = perf_counter()
+        await asyncio.gather(
+            *(worker(offset, n, client) for n, client in enumerate(clients))
+        )
+        throughputs.append(
+            (len(latencies) - sent) / (perf_counter() - started)
+        )
+
+    # quantiles needs two samples, which skipped requests may not leave
+    samples = latencies if len(latencies) > 1 else (latencies or [0.0]) * 2
+    p = quantiles(samples, n=100, method='inclusive')
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'skipped': skipped,
+        'throughput': round(median(throughputs), 1),
+        'p50_ms': round(p[49] * 1000, 2),
+        'p95_ms': round(p[94] * 1000, 2),
+        'p99_ms': round(p[98] * 1000, 2),
+    }
+
+
+def compare(baseline: dict, results: dict, tolerance: float) -> dict:
+    """Relative change of each endpoint's numbers against `baseline`,
+    plus the endpoints that regressed by more than `tolerance`."""
+    changes = {}
+    regressions = []
+    for name, current in results['endpoints'].items():
+        previous = baseline['endpoints'].get(name)
+        if previous is None:
+            continue
+
+        change = {
+            key: round(current[key] / previous[key] - 1, 3)
+            for key in ('throughput', 'p50_ms', 'p95_ms', 'p99_ms')
+            if previous[key]
+        }
+        changes[name] = change
+        if (
+            change.get('throughput', 0) < -tolerance
+            or change.get('p95_ms', 0) > tolerance
+        ):
+            regressions.append(name)
+
+    return {'changes': changes, 'regressions': regressions}
+
+
+async def main(
+    url: str, concurrency: int, requests: int, rounds: int, todos: int
+):
+    engine = database.create_engine(database.settings, url)
+    database.engine = engine
+    database.replicas = database.ReplicaRouter([], 0, 1)
+    clients = await seed(engine, concurrency, todos)
+
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(
+            transport=transport, base_url='http://bench'
+        ) as http,
+    ):
+        for client in clients:
+            response = await login(http, client, 0)
+            token = response.json()['access_token']
+            client.headers = {'Authorization': f'Bearer {token}'}
+
+        for name, (request, expected, share) in SCENARIOS.items():
+            results[name] = await run(
+                http,
+                clients,
+                request,
+                expected,
+                max(int(requests * share), 2),
+                rounds,
+            )
+
+    return {
+        'database': engine.dialect.name,
+        'concurrency': concurrency,
+        'rounds': rounds,
+        'todos_per_user': todos,
+        'endpoints': results,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_database_arguments(parser)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--todos', type=int, default=1_000)
+    parser.add_argument('--output')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    args = parse_args(parser)
+    # Deep pages start past the first half, with at least one offset left.
+    if args.todos < 2 * LIMIT + 2:
+        parser.error(f'--todos must be at least {2 * LIMIT + 2}')
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.url or f'sqlite+aiosqlite:///{directory}/load.db'
+        results = asyncio.run(
+            main(url, args.concurrency, args.requests, args.rounds, args.todos)
+        )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline:
+            results['baseline'] = compare(
+                json.load(baseline), results, args.tolerance
+            )
+        regressions = results['baseline']['regressions']
+
+    print(json.dumps(results, indent=2))
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,115 @@
+"""Compare offset and cursor pagination of the todo listing query.
+
+Seeds a single user with enough todos to reach the requested page and
+times page 1 against that page in both modes, using the same `paginate`
+helper as `GET /todos`. Results are printed as JSON. Seeding drops every
+table of `--url`, so any database but the default in-memory one also
+needs `--reset`.
+
+    python -m benchmarks.pagination --page 10000
+    python -m benchmarks.pagination --url postgresql+psycopg://... --reset
+"""
+
+import argparse
+import asyncio
+import json
+from time import perf_counter
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from benchmarks import add_database_arguments, parse_args
+from fastapi_zero.models import Todo, TodoState, User, table_registry
+from fastapi_zero.pagination import encode_cursor, next_page, paginate
+from fastapi_zero.schemas import TodoFilter
+
+
+async def seed(engine, rows: int) -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.drop_all)
+        await conn.run_sync(table_registry.metadata.create_all)
+        user_id = await conn.scalar(
+            insert(User)
+            .values(username='bench', email='bench@test.com', password_hash='')
+            .returning(User.id)
+        )
+        batch = 10_000
+        for start in range(0, rows, batch):
+            await conn.execute(
+                insert(Todo),
+                [
+                    {
+                        'title': f'Todo {i}',
+                        'description': f'Description {i}',
+                        'state': TodoState.NEW,
+                        'user_id': user_id,
+                    }
+                    for i in range(start, min(start + batch, rows))
+                ],
+            )
+    return user_id
+
+
+async def time_page(engine, user_id, filter, repeat: int) -> float:
+    query = select(Todo).where(Todo.user_id == user_id)
+    best = float('inf')
+    async with AsyncSession(engine) as session:
+        for _ in range(repeat):
+            started = perf_counter()
+            todos = await session.scalars(paginate(query, Todo.id, filter))
+            next_page(todos.all(), filter)
+            best = min(best, perf_counter() - started)
+            session.expunge_all()
+    return best
+
+
+async def main(url: str, page: int, limit: int, repeat: int):
+    engine = create_async_engine(url)
+    rows = (page + 1) * limit
+    user_id = await seed(engine, rows)
+
+    async with engine.connect() as conn:
+        ids = await conn.scalars(
+            select(Todo.id)
+            .where(Todo.user_id == user_id)
+            .order_by(Todo.id)
+            .offset((page - 1) * limit - 1)
+            .limit(1)
+        )
+        last_seen_id = ids.one()
+
+    results = {}
+    for mode, first, deep in [
+        (
+            'offset',
+            TodoFilter(limit=limit),
+            TodoFilter(limit=limit, skip=(page - 1) * limit),
+        ),
+        (
+            'cursor',
+            TodoFilter(limit=limit),
+            TodoFilter(limit=limit, cursor=encode_cursor(last_seen_id)),
+        ),
+    ]:
+        results[mode] = {
+            'page_1_ms': await time_page(engine, user_id, first, repeat)
+            * 1000,
+            f'page_{page}_ms': await time_page(engine, user_id, deep, repeat)
+            * 1000,
+        }
+
+    await engine.dispose()
+    print(json.dumps({'rows': rows, 'limit': limit, **results}, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_database_arguments(parser, 'sqlite+aiosqlite:///:memory:')
+    parser.add_argument('--page', type=int, default=10_000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parse_args(parser)
+    # The cursor of page N is the id of the last todo on page N - 1
+    if args.page < 2:  # noqa: PLR2004
+        parser.error('--page must be at least 2')
+    asyncio.run(main(args.url, args.page, args.limit, args.repeat))
@@ -0,0 +1,109 @@
+"""Compare loading a todo page as ORM entities and as column rows.
+
+Seeds a single user with `--rows` todos and loads pages of `--limit`
+todos through one session, validated into `ListTodoResponse`, either as
+`select(Todo)` entities, which the session tracks in its identity map
+until it closes, or as the plain rows `GET /todos` selects. Reports the
+peak memory allocated while building a page, how many objects the garbage
+collector tracks once the pages are loaded, the generation 0/1/2
+collections triggered, and the time per page. Results are printed as JSON.
+Seeding drops every table of `--url`, so any database but the default
+in-memory one also needs `--reset`.
+
+    python -m benchmarks.read_models --rows 100000 --limit 1000
+    python -m benchmarks.read_models --url postgresql+psycopg://... --reset
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import tracemalloc
+from time import perf_counter
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from benchmarks import add_database_arguments, parse_args
+from benchmarks.pagination import seed
+from fastapi_zero.models import Todo
+from fastapi_zero.routers.todos import TODO_COLUMNS
+from fastapi_zero.schemas import ListTodoResponse
+
+
+async def entities(session, user_id, offset, limit):
+    return (
+        await session.scalars(
+            select(Todo)
+            .where(Todo.user_id == user_id)
+            .order_by(Todo.id)
+            .offset(offset)
+            .limit(limit)
+        )
+    ).all()
+
+
+async def rows(session, user_id, offset, limit):
+    return (
+        await session.execute(
+            select(*TODO_COLUMNS, Todo.version)
+            .where(Todo.user_id == user_id)
+            .order_by(Todo.id)
+            .offset(offset)
+            .limit(limit)
+        )
+    ).all()
+
+
+async def measure(engine, user_id, load, total: int, limit: int) -> dict:
+    gc.collect()
+    collections = [stats['collections'] for stats in gc.get_stats()]
+    tracked = len(gc.get_objects())
+    peak = 0
+    started = perf_counter()
+
+    async with AsyncSession(engine) as session:
+        for offset in range(0, total, limit):
+            tracemalloc.start()
+            todos = await load(session, user_id, offset, limit)
+            ListTodoResponse.model_validate(
+                {'todos': todos, 'next_cursor': None}, from_attributes=True
+            ).model_dump_json()
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            del todos
+
+        elapsed = perf_counter() - started
+        retained = len(gc.get_objects()) - tracked
+
+    return {
+        'peak_kib_per_page': round(peak / 1024),
+        'gc_objects_retained': retained,
+        'gc_collections': [
+            stats['collections'] - before
+            for stats, before in zip(gc.get_stats(), collections)
+        ],
+        'ms_per_page': round(elapsed * 1000 / (total // limit), 2),
+    }
+
+
+async def main(url: str, total: int, limit: int):
+    engine = create_async_engine(url)
+    user_id = await seed(engine, total)
+
+    results = {
+        'entities': await measure(engine, user_id, entities, total, limit),
+        'rows': await measure(engine, user_id, rows, total, limit),
+    }
+
+    await engine.dispose()
+    print(json.dumps({'todos': total, 'limit': limit, **results}, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_database_arguments(parser, 'sqlite+aiosqlite:///:memory:')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--limit', type=int, default=1_000)
+    args = parse_args(parser)
+    asyncio.run(main(args.url, args.rows, args.limit))
@@ -0,0 +1,114 @@
+"""Measure todo search latency as a user's todo count grows.
+
+Seeds one user with a growing number of todos drawn from a fixed
+vocabulary and times `GET /todos?q=...` style queries built by
+`search_todos` at each size, alongside the legacy `title` substring
+filter. Results are printed as JSON. Every table of `--url` is dropped
+before seeding, so `--reset` must confirm any database but the default
+in-memory one.
+
+    python -m benchmarks.search --url postgresql+psycopg://... --reset
+    python -m benchmarks.search --sizes 1000 10000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from time import perf_counter
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from benchmarks import add_database_arguments, parse_args
+from fastapi_zero.models import Todo, TodoState, User, table_registry
+from fastapi_zero.search import search_todos
+
+WORDS = [f'word{n}' for n in range(5_000)]
+NEEDLE = 'needle'
+
+
+def todo_row(user_id: int, rng: random.Random, needle: bool) -> dict:
+    title = ' '.join(rng.choices(WORDS, k=4))
+    description = ' '.join(rng.choices(WORDS, k=20))
+    if needle:
+        description = f'{description} {NEEDLE}'
+    return {
+        'title': title,
+        'description': description,
+        'state': TodoState.NEW,
+        'user_id': user_id,
+    }
+
+
+async def seed(engine, user_id: int, start: int, stop: int):
+    rng = random.Random(start)
+    async with engine.begin() as conn:
+        for offset in range(start, stop, 10_000):
+            await conn.execute(
+                insert(Todo),
+                [
+                    todo_row(user_id, rng, needle=n % 1_000 == 0)
+                    for n in range(offset, min(offset + 10_000, stop))
+                ],
+            )
+    async with engine.begin() as conn:
+        if engine.dialect.name == 'postgresql':
+            await conn.exec_driver_sql('ANALYZE todos')
+
+
+async def time_query(engine, query, repeat: int) -> float:
+    best = float('inf')
+    async with AsyncSession(engine) as session:
+        for _ in range(repeat):
+            started = perf_counter()
+            (await session.scalars(query.limit(10))).all()
+            best = min(best, perf_counter() - started)
+            session.expunge_all()
+    return best * 1000
+
+
+async def main(url: str, sizes: list[int], repeat: int):
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.drop_all)
+        await conn.run_sync(table_registry.metadata.create_all)
+        user_id = await conn.scalar(
+            insert(User)
+            .values(username='bench', email='bench@test.com', password_hash='')
+            .returning(User.id)
+        )
+
+    results = []
+    seeded = 0
+    for size in sorted(sizes):
+        await seed(engine, user_id, seeded, size)
+        seeded = size
+        base = select(Todo).where(Todo.user_id == user_id)
+        results.append({
+            'todos': size,
+            'search_ms': await time_query(
+                engine,
+                search_todos(base, NEEDLE, engine.dialect.name),
+                repeat,
+            ),
+            'title_contains_ms': await time_query(
+                engine,
+                base.where(Todo.title.contains('word4999')).order_by(Todo.id),
+                repeat,
+            ),
+        })
+
+    await engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_database_arguments(parser, 'sqlite+aiosqlite:///:memory:')
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parse_args(parser)
+    asyncio.run(main(args.url, args.sizes, args.repeat))
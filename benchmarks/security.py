@@ -0,0 +1,253 @@
+"""Measure the security hot path: tokens, passwords and principals.
+
+Times `create_access_token` and token decoding for each of
+`--algorithms`, `get_password_hash` and `verify_password` with the given
+Argon2 cost (the app's settings by default), and `get_current_user` with
+the principal cached and loaded from a SQLite database. Reports
+operations per second and the peak Python memory allocated per operation,
+traced by tracemalloc; Argon2 allocates its `memory_cost` KiB outside of
+Python, so that is not included. Results are printed as JSON.
+
+With `--calibrate`, measures password verification, which is what a login
+waits on, for growing memory costs instead, and recommends the
+`PASSWORD_HASH_*` settings that make it as hard as possible within
+`--target-ms` on this machine.
+
+    python -m benchmarks.security
+    python -m benchmarks.security --time-cost 2 --memory-cost 19456
+    python -m benchmarks.security --calibrate --target-ms 250
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import tracemalloc
+from inspect import isawaitable
+from statistics import median
+from time import perf_counter
+
+from jwt import decode
+from sqlalchemy import insert
+
+from fastapi_zero import database, security
+from fastapi_zero.models import User, table_registry
+
+PASSWORD = 'benchmark'
+EMAIL = 'bench@test.com'
+# Argon2id memory costs tried by calibration, in KiB, starting from the
+# 19 MiB OWASP recommends as a minimum.
+MEMORY_COSTS = (19_456, 32_768, 65_536, 131_072, 262_144, 524_288)
+
+
+async def measure(call, seconds: float) -> dict:
+    """Call `call` for about `seconds`, awaiting it if it is a coroutine
+    function, then trace the allocations of a few more calls."""
+    operations = 0
+    started = perf_counter()
+    while operations < 3 or perf_counter() - started < seconds:  # noqa: PLR2004
+        result = call()
+        if isawaitable(result):
+            await result
+        operations += 1
+    elapsed = perf_counter() - started
+
+    peaks = []
+    tracemalloc.start()
+    for _ in range(3):
+        tracemalloc.reset_peak()
+        traced = tracemalloc.get_traced_memory()[0]
+        result = call()
+        if isawaitable(result):
+            await result
+        peaks.append(tracemalloc.get_traced_memory()[1] - traced)
+    tracemalloc.stop()
+
+    return {
+        'ops_per_second': round(operations / elapsed, 1),
+        'us_per_op': round(elapsed * 1_000_000 / operations, 1),
+        'peak_kib_per_op': round(median(peaks) / 1024, 1),
+    }
+
+
+async def tokens(algorithms: list[str], seconds: float) -> dict:
+    settings = security.settings
+    configured = settings.JWT_ALGORITHM
+    results = {}
+    for algorithm in algorithms:
+        settings.JWT_ALGORITHM = algorithm
+        token = security.create_access_token({'sub': EMAIL})
+        results[algorithm] = {
+            'create_access_token': await measure(
+                lambda: security.create_access_token({'sub': EMAIL}), seconds
+            ),
+            'decode': await measure(
+                lambda: decode(
+                    token, settings.JWT_SECRET_KEY, algorithms=[algorithm]
+                ),
+                seconds,
+            ),
+        }
+    settings.JWT_ALGORITHM = configured
+    return results
+
+
+async def passwords(seconds: float) -> dict:
+    hash = security.get_password_hash(PASSWORD)
+    return {
+        'get_password_hash': await measure(
+            lambda: security.get_password_hash(PASSWORD), seconds
+        ),
+        'verify_password': await measure(
+            lambda: security.verify_password(PASSWORD, hash), seconds
+        ),
+    }
+
+
+async def principals(directory: str, seconds: float) -> dict:
+    engine = database.create_engine(
+        security.settings, f'sqlite+aiosqlite:///{directory}/security.db'
+    )
+    database.engine = engine
+    database.replicas = database.ReplicaRouter([], 0, 1)
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+        await conn.execute(
+            insert(User).values(
+                username='bench', email=EMAIL, password_hash=''
+            )
+        )
+
+    token = security.create_access_token({'sub': EMAIL})
+
+    async def uncached():
+        security.principal_cache.clear()
+        await security.get_current_user(token)
+
+    results = {
+        'get_current_user (database)': await measure(uncached, seconds),
+        'get_current_user (cached)': await measure(
+            lambda: security.get_current_user(token), seconds
+        ),
+    }
+    await engine.dispose()
+    return results
+
+
+def verify_ms(
+    time_cost: int, memory_cost: int, parallelism: int, repeat: int
+) -> float:
+    hasher = security.password_hasher(time_cost, memory_cost, parallelism)
+    hash = hasher.hash(PASSWORD)
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        hasher.verify(PASSWORD, hash)
+        timings.append(perf_counter() - started)
+    return median(timings) * 1000
+
+
+def calibrate(
+    target_ms: float, parallelism: int, max_memory_cost: int, repeat: int
+) -> dict:
+    """For each memory cost, find the highest time cost verifying within
+    `target_ms`, and recommend the largest memory cost that still affords
+    two passes, as OWASP suggests, or else one."""
+    candidates = []
+    for memory_cost in MEMORY_COSTS:
+        if memory_cost > max_memory_cost:
+            break
+
+        def verify(time_cost, memory_cost=memory_cost):
+            return verify_ms(time_cost, memory_cost, parallelism, repeat)
+
+        # Start from a linear estimate, which undershoots since a single
+        # pass also pays for allocating the memory, then walk up.
+        time_cost = max(int(target_ms // verify(1)), 1)
+        elapsed = verify(time_cost)
+        while time_cost > 1 and elapsed > target_ms:
+            time_cost -= 1
+            elapsed = verify(time_cost)
+        if elapsed > target_ms:
+            break
+        while (longer := verify(time_cost + 1)) <= target_ms:
+            time_cost += 1
+            elapsed = longer
+
+        candidates.append({
+            'PASSWORD_HASH_TIME_COST': time_cost,
+            'PASSWORD_HASH_MEMORY_COST': memory_cost,
+            'PASSWORD_HASH_PARALLELISM': parallelism,
+            'verify_ms': round(elapsed, 1),
+        })
+
+    two_passes = [
+        candidate
+        for candidate in candidates
+        if candidate['PASSWORD_HASH_TIME_COST'] >= 2  # noqa: PLR2004
+    ]
+    recommended = (two_passes or candidates or [None])[-1]
+    results = {
+        'target_ms': target_ms,
+        'candidates': candidates,
+        'recommended': recommended,
+    }
+    if recommended:
+        # Every password worker holds its own Argon2 memory while hashing.
+        results['peak_memory_mib'] = (
+            recommended['PASSWORD_HASH_MEMORY_COST']
+            * security.settings.PASSWORD_HASH_MAX_WORKERS
+            // 1024
+        )
+    return results
+
+
+async def main(args: argparse.Namespace) -> dict:
+    security.pwd_context = security.password_hasher(
+        args.time_cost, args.memory_cost, args.parallelism
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        return {
+            'argon2': {
+                'time_cost': args.time_cost,
+                'memory_cost': args.memory_cost,
+                'parallelism': args.parallelism,
+            },
+            'tokens': await tokens(args.algorithms, args.seconds),
+            'passwords': await passwords(args.seconds),
+            'principals': await principals(directory, args.seconds),
+        }
+
+
+if __name__ == '__main__':
+    settings = security.settings
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--algorithms',
+        nargs='+',
+        choices=['HS256', 'HS384', 'HS512'],
+        default=['HS256', 'HS384', 'HS512'],
+    )
+    parser.add_argument(
+        '--time-cost', type=int, default=settings.PASSWORD_HASH_TIME_COST
+    )
+    parser.add_argument(
+        '--memory-cost', type=int, default=settings.PASSWORD_HASH_MEMORY_COST
+    )
+    parser.add_argument(
+        '--parallelism', type=int, default=settings.PASSWORD_HASH_PARALLELISM
+    )
+    parser.add_argument('--seconds', type=float, default=1.0)
+    parser.add_argument('--calibrate', action='store_true')
+    parser.add_argument('--target-ms', type=float, default=250)
+    parser.add_argument('--max-memory-cost', type=int, default=262_144)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.calibrate:
+        results = calibrate(
+            args.target_ms, args.parallelism, args.max_memory_cost, args.repeat
+        )
+    else:
+        results = asyncio.run(main(args))
+    print(json.dumps(results, indent=2))
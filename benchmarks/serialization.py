@@ -0,0 +1,100 @@
+"""Compare the default and fast JSON paths of the todo listing.
+
+Seeds a single user with `--rows` todos, then loads and serializes pages
+of `--limit` todos the way `GET /todos` does: row tuples validated into
+`ListTodoResponse` and dumped by pydantic, or encoded directly by
+`fast_json.dumps` (with orjson, and with the standard library fallback).
+Throughput is reported in rows per CPU second of this process, i.e. per
+core, so a remote database's own work is not counted. Results are printed
+as JSON. Seeding drops every table of `--url`, so any database but the
+default in-memory one also needs `--reset`.
+
+    python -m benchmarks.serialization --rows 100000 --limit 100
+    python -m benchmarks.serialization --url postgresql+psycopg://... --reset
+"""
+
+import argparse
+import asyncio
+import json
+from time import process_time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from benchmarks import add_database_arguments, parse_args
+from benchmarks.pagination import seed
+from fastapi_zero import fast_json
+from fastapi_zero.models import Todo
+from fastapi_zero.routers.todos import TODO_COLUMNS, TODO_FIELDS
+from fastapi_zero.schemas import ListTodoResponse
+
+
+async def default_page(session, query) -> bytes:
+    query = query.with_only_columns(*TODO_COLUMNS, Todo.version)
+    todos = (await session.execute(query)).all()
+    page = ListTodoResponse.model_validate(
+        {'todos': todos, 'next_cursor': None}, from_attributes=True
+    )
+    return page.model_dump_json().encode()
+
+
+async def fast_page(session, query) -> bytes:
+    query = query.with_only_columns(*TODO_COLUMNS, Todo.version)
+    todos = (await session.execute(query)).all()
+    return fast_json.dumps({
+        'todos': fast_json.records(TODO_FIELDS, todos),
+        'next_cursor': None,
+    })
+
+
+async def rows_per_second(engine, user_id, page, rows, limit) -> float:
+    async with AsyncSession(engine) as session:
+        started = process_time()
+        for offset in range(0, rows, limit):
+            query = (
+                select(Todo)
+                .where(Todo.user_id == user_id)
+                .order_by(Todo.id)
+                .offset(offset)
+                .limit(limit)
+            )
+            await page(session, query)
+            session.expunge_all()
+        return rows / (process_time() - started)
+
+
+async def main(url: str, rows: int, limit: int):
+    engine = create_async_engine(url)
+    user_id = await seed(engine, rows)
+
+    orjson = fast_json.orjson
+    results = {}
+    for path, page, encoder in [
+        ('default', default_page, orjson),
+        ('fast_orjson', fast_page, orjson),
+        ('fast_json', fast_page, None),
+    ]:
+        if path == 'fast_orjson' and orjson is None:
+            continue
+        fast_json.orjson = encoder
+        results[path] = round(
+            await rows_per_second(engine, user_id, page, rows, limit)
+        )
+    fast_json.orjson = orjson
+
+    await engine.dispose()
+    print(
+        json.dumps(
+            {'rows': rows, 'limit': limit, 'rows_per_second': results},
+            indent=2,
+        )
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_database_arguments(parser, 'sqlite+aiosqlite:///:memory:')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--limit', type=int, default=100)
+    args = parse_args(parser)
+    asyncio.run(main(args.url, args.rows, args.limit))
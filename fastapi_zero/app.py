@@ -1,8 +1,31 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from fastapi_zero.routers import auth, todos, users
+from fastapi_zero import database
+from fastapi_zero.metrics import MetricsMiddleware
+from fastapi_zero.routers import auth, metrics, todos, users
+from fastapi_zero.security import password_executor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = database.settings
+    warmup = settings.DATABASE_POOL_WARMUP
+    engines = [database.engine, *database.replicas.engines]
+    for engine in engines:
+        await database.warm_up(
+            engine, settings.DATABASE_POOL_SIZE if warmup is None else warmup
+        )
+    yield
+    for engine in engines:
+        await engine.dispose()
+    password_executor.shutdown()
+
 
-app = FastAPI(title='FastAPI Zero', version='0.1.0')
+app = FastAPI(title='FastAPI Zero', version='0.1.0', lifespan=lifespan)
 app.include_router(users.router)
 app.include_router(auth.router)
 app.include_router(todos.router)
+app.include_router(metrics.router)
+app.add_middleware(MetricsMiddleware)
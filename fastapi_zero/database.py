@@ -1,10 +1,161 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from itertools import cycle
+from time import perf_counter
 
+from sqlalchemy import AsyncAdaptedQueuePool, QueuePool, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+
+from fastapi_zero.cache import LRUCache
+from fastapi_zero.metrics import instrument_engine
 from fastapi_zero.settings import Settings
 
-engine = create_async_engine(Settings().DATABASE_URL)
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a
+    connection, including the time spent opening a new one."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_wait_seconds_total = 0.0
+        self.checkout_wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = perf_counter() - started
+            self.checkouts += 1
+            self.checkout_wait_seconds_total += wait
+            self.checkout_wait_seconds_max = max(
+                self.checkout_wait_seconds_max, wait
+            )
+
+
+def create_engine(settings: Settings, url: str | None = None) -> AsyncEngine:
+    url = make_url(url or settings.DATABASE_URL)
+    options = {
+        'pool_pre_ping': settings.DATABASE_POOL_PRE_PING,
+        'pool_recycle': settings.DATABASE_POOL_RECYCLE,
+    }
+
+    # In-memory SQLite lives and dies with its single connection, so it
+    # keeps the static pool SQLAlchemy picks for it.
+    if url.get_backend_name() != 'sqlite' or url.database not in {
+        None,
+        '',
+        ':memory:',
+    }:
+        options.update(
+            poolclass=InstrumentedPool,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        )
+
+    if url.get_driver_name() == 'psycopg':
+        options['connect_args'] = {
+            'prepare_threshold': settings.DATABASE_PREPARE_THRESHOLD
+        }
+
+    engine = create_async_engine(url, **options)
+    instrument_engine(engine)
+    return engine
+
+
+class ReplicaRouter:
+    """Spreads read-only sessions over replica engines round-robin.
+
+    Subjects that wrote within the last `read_your_writes_seconds` keep
+    reading from the primary, so they never observe replication lag on
+    their own writes. Up to `max_subjects` of them are pinned at once;
+    beyond that the least recent writers go back to the replicas early.
+    """
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        read_your_writes_seconds: float,
+        max_subjects: int,
+    ):
+        self.engines = engines
+        self.recent_writers = LRUCache(
+            maxsize=max_subjects, ttl=read_your_writes_seconds
+        )
+        self._next = cycle(engines)
+
+    def pick(self, subject: str | None = None) -> AsyncEngine | None:
+        """Return the replica to read from, or None for the primary."""
+        if not self.engines or (subject and subject in self.recent_writers):
+            return None
+        return next(self._next)
+
+    def mark_write(self, subject: str) -> None:
+        self.recent_writers.set(subject, True)
+
+
+settings = Settings()
+engine = create_engine(settings)
+replicas = ReplicaRouter(
+    [create_engine(settings, url) for url in settings.DATABASE_REPLICA_URLS],
+    settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+    settings.DATABASE_READ_YOUR_WRITES_MAX_SUBJECTS,
+)
+
+
+def get_read_engine(subject: str | None = None) -> AsyncEngine:
+    return replicas.pick(subject) or engine
+
+
+def mark_write(subject: str) -> None:
+    replicas.mark_write(subject)
 
 
 async def get_session():
     async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
+
+
+async def get_read_session():
+    async with AsyncSession(
+        get_read_engine(), expire_on_commit=False
+    ) as session:
+        yield session
+
+
+async def warm_up(engine: AsyncEngine, connections: int) -> None:
+    """Open `connections` pooled connections up front so the first
+    requests after startup do not pay for connecting."""
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = await engine.connect()
+            opened.append(connection)
+            await connection.exec_driver_sql('SELECT 1')
+    finally:
+        for connection in opened:
+            await connection.close()
+
+
+def pool_stats(engine: AsyncEngine) -> dict[str, int | float]:
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return {}
+
+    stats = {
+        'size': pool.size(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+    }
+    if isinstance(pool, InstrumentedPool):
+        stats.update(
+            checkouts=pool.checkouts,
+            checkout_wait_seconds_total=pool.checkout_wait_seconds_total,
+            checkout_wait_seconds_max=pool.checkout_wait_seconds_max,
+        )
+    return stats
@@ -0,0 +1,74 @@
+import re
+from collections.abc import Hashable, Iterable
+from hashlib import blake2b
+from http import HTTPStatus
+
+from fastapi import Response
+
+NOT_MODIFIED = {HTTPStatus.NOT_MODIFIED.value: {'description': 'Not Modified'}}
+PRECONDITION_FAILED = {
+    HTTPStatus.PRECONDITION_FAILED.value: {
+        'description': 'Precondition Failed'
+    }
+}
+
+
+def make_etag(versions: Iterable[tuple[int, Hashable]]) -> str:
+    """Strong ETag for a representation built from rows identified by
+    their `(id, version)` pairs, in response order.
+
+    The version is anything that changes on every write, such as a
+    version counter. Only the pairs are hashed, not the serialized rows.
+    The ETag is cached with the response, so `If-None-Match` is answered
+    from the response cache on a hit, and after loading and serializing
+    the rows on a miss.
+    """
+    digest = blake2b(digest_size=16)
+    for row_id, version in versions:
+        digest.update(f'{row_id}:{version};'.encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def version_etag(version: int) -> str:
+    """Strong ETag of a single versioned row. Unlike `make_etag` it can be
+    read back with `if_match_versions`."""
+    return f'"{version}"'
+
+
+def _tags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(',')]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an `If-None-Match` header matches `etag`, using the weak
+    comparison RFC 9110 prescribes for that header."""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == '*':
+        return True
+
+    return etag in {tag.removeprefix('W/') for tag in _tags(if_none_match)}
+
+
+def if_match_versions(if_match: str | None) -> list[int] | None:
+    """Versions an `If-Match` header allows a write to apply to, or None
+    when the write is unconditional.
+
+    `If-Match` uses strong comparison, so weak and unparseable tags match
+    no version at all.
+    """
+    if not if_match or if_match.strip() == '*':
+        return None
+
+    return [
+        int(match[1])
+        for tag in _tags(if_match)
+        if (match := re.fullmatch(r'"(\d+)"', tag))
+    ]
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED, headers={'ETag': etag}
+    )
@@ -0,0 +1,91 @@
+import asyncio
+from asyncio import QueueFull
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from time import monotonic
+from typing import Callable, Literal
+
+ExecutorKind = Literal['thread', 'process']
+
+
+class BoundedExecutor:
+    """Runs blocking callables off the event loop on a thread or process
+    pool.
+
+    At most `max_workers` calls run at once and at most `max_queue` calls
+    wait for a free worker; further calls fail fast with `QueueFull`
+    instead of piling up behind a slow pool. Queueing happens on the event
+    loop, so depth and wait time are measured the same way for both pool
+    kinds.
+    """
+
+    def __init__(self, kind: ExecutorKind, max_workers: int, max_queue: int):
+        if kind not in {'thread', 'process'}:
+            raise ValueError(f'Unknown executor kind: {kind}')
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._slots = asyncio.Semaphore(max_workers)
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == 'process':
+                self._executor = ProcessPoolExecutor(self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix='bounded-executor'
+                )
+        return self._executor
+
+    async def run(self, fn: Callable, *args):
+        if self._slots.locked() and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise QueueFull
+
+        queued_at = monotonic()
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        wait = monotonic() - queued_at
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+        self.active += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'active': self.active,
+            'queue_depth': self.queued,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'wait_seconds_total': self.wait_seconds_total,
+            'wait_seconds_max': self.wait_seconds_max,
+        }
@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from enum import Enum
+from typing import Literal
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fastapi_zero.models import Todo
+from fastapi_zero.schemas import TodoResponse
+
+ExportFormat = Literal['ndjson', 'csv']
+
+MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+COLUMNS = [getattr(Todo, field) for field in TodoResponse.model_fields]
+
+
+async def export_todos(
+    session: AsyncSession, user_id: int, format: ExportFormat, chunk_size: int
+) -> AsyncIterator[bytes]:
+    """Stream every todo of `user_id` in `format`, one chunk per
+    `chunk_size` rows.
+
+    Rows are plain tuples fetched through a server-side cursor where the
+    driver supports one, so memory use depends on `chunk_size` only, never
+    on how many todos the user has.
+    """
+    fields = list(TodoResponse.model_fields)
+    result = await session.stream(
+        select(*COLUMNS)
+        .where(Todo.user_id == user_id)
+        .order_by(Todo.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    if format == 'csv':
+        yield _csv_lines([fields])
+
+    async for rows in result.partitions():
+        values = ([_plain(value) for value in row] for row in rows)
+        if format == 'csv':
+            yield _csv_lines(values)
+        else:
+            yield ''.join(
+                json.dumps(dict(zip(fields, row))) + '\n' for row in values
+            ).encode()
+
+
+def _plain(value):
+    return value.value if isinstance(value, Enum) else value
+
+
+def _csv_lines(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
@@ -0,0 +1,25 @@
+import json
+from collections.abc import Iterable, Sequence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def dumps(content) -> bytes:
+    """Encode plain JSON-compatible data to bytes with orjson when it is
+    installed, else with the standard library. Both produce the same
+    compact output as `model_dump_json` for the types responses use."""
+    if orjson is not None:
+        return orjson.dumps(content)
+
+    return json.dumps(
+        content, ensure_ascii=False, separators=(',', ':')
+    ).encode()
+
+
+def records(fields: Sequence[str], rows: Iterable[Sequence]) -> list[dict]:
+    """Pair row tuples with `fields`, in order. Trailing columns beyond
+    `fields`, such as a version selected only for the ETag, are dropped."""
+    return [dict(zip(fields, row)) for row in rows]
@@ -0,0 +1,164 @@
+import codecs
+import csv
+import logging
+from collections.abc import AsyncIterable, AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fastapi_zero.export import ExportFormat
+from fastapi_zero.models import Todo
+from fastapi_zero.schemas import CreateTodoRequest
+
+logger = logging.getLogger(__name__)
+
+COPY_TODOS = 'COPY todos (title, description, state, user_id) FROM STDIN'
+
+
+async def import_todos(  # noqa: PLR0913, PLR0917
+    session: AsyncSession,
+    user_id: int,
+    chunks: AsyncIterable[bytes],
+    format: ExportFormat,
+    batch_size: int,
+    max_errors: int,
+) -> dict:
+    """Insert the todos of an NDJSON or CSV upload as it streams in.
+
+    Rows are validated against `CreateTodoRequest` and written every
+    `batch_size` valid rows, with `COPY` on Postgres and `executemany`
+    elsewhere, so only one batch is held in memory. Invalid rows are
+    skipped and reported by line number; only the first `max_errors` of
+    them are kept. Progress is logged after every batch. Nothing is
+    committed here.
+    """
+    imported = failed = 0
+    errors = []
+    batch = []
+
+    async def flush():
+        nonlocal imported
+        await _write(session, user_id, batch)
+        imported += len(batch)
+        batch.clear()
+        logger.info(
+            'Imported %d todos for user %d, %d rows failed',
+            imported,
+            user_id,
+            failed,
+        )
+
+    parse = _parse_csv if format == 'csv' else _parse_ndjson
+    async for line, todo in parse(_lines(chunks)):
+        if isinstance(todo, CreateTodoRequest):
+            batch.append(todo)
+            if len(batch) >= batch_size:
+                await flush()
+            continue
+
+        failed += 1
+        if len(errors) < max_errors:
+            errors.append({'line': line, 'detail': todo})
+
+    if batch:
+        await flush()
+
+    return {'imported': imported, 'failed': failed, 'errors': errors}
+
+
+async def _write(
+    session: AsyncSession, user_id: int, todos: list[CreateTodoRequest]
+):
+    rows = [
+        (todo.title, todo.description or '', todo.state.name, user_id)
+        for todo in todos
+    ]
+    connection = await session.connection()
+
+    if connection.dialect.driver != 'psycopg':
+        await session.execute(
+            insert(Todo),
+            [
+                dict(zip(('title', 'description', 'state', 'user_id'), row))
+                for row in rows
+            ],
+        )
+        return
+
+    raw = await connection.get_raw_connection()
+    async with raw.driver_connection.cursor() as cursor:
+        async with cursor.copy(COPY_TODOS) as copy:
+            for row in rows:
+                await copy.write_row(row)
+
+
+async def _lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    # Drops the byte order mark spreadsheets put in front of UTF-8 CSVs
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield line + '\n'
+
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def _validate(validate, value) -> CreateTodoRequest | str:
+    try:
+        return validate(value)
+    except ValidationError as exc:
+        return '; '.join(
+            f'{".".join(map(str, error["loc"])) or "row"}: {error["msg"]}'
+            for error in exc.errors()
+        )
+
+
+async def _parse_ndjson(lines: AsyncIterator[str]):
+    number = 0
+    async for line in lines:
+        number += 1
+        if line.strip():
+            yield (
+                number,
+                _validate(CreateTodoRequest.model_validate_json, line),
+            )
+
+
+async def _parse_csv(lines: AsyncIterator[str]):
+    """Yield each CSV record validated, numbered by the line it starts
+    on. A record only ends at a newline outside quotes, so quoted fields
+    may span lines."""
+    header = None
+    number = start = 0
+    record = ''
+    async for line in lines:
+        number += 1
+        if not record:
+            start = number
+        record += line
+        if record.count('"') % 2:
+            continue
+
+        values = next(csv.reader([record]), [])
+        record = ''
+        if header is None:
+            header = values
+        elif not any(values):
+            continue
+        elif len(values) != len(header):
+            yield start, f'row: expected {len(header)} fields'
+        else:
+            yield (
+                start,
+                _validate(
+                    CreateTodoRequest.model_validate, dict(zip(header, values))
+                ),
+            )
+
+    if record:
+        yield start, 'row: unterminated quoted field'
@@ -0,0 +1,335 @@
+import logging
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from fastapi_zero.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Keys of the `stats()` dicts exposed as counters; everything else is a
+# gauge.
+COUNTER_STATS = {
+    'hits',
+    'misses',
+    'evictions',
+    'expirations',
+    'completed',
+    'rejected',
+    'checkouts',
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram, cheap enough to update on every request."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """`(le, count)` pairs as Prometheus expects them, where each
+        bucket also counts every observation below it."""
+        total = 0
+        pairs = []
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            total += count
+            pairs.append((str(bound), total))
+        return pairs
+
+
+class RequestStats:
+    """Database work done while serving the current request.
+
+    Statements are counted per SQL text, which SQLAlchemy renders with
+    placeholders, so the same query run for different rows counts as one
+    repeated template.
+    """
+
+    __slots__ = ('queries', 'db_seconds', 'statements')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements = Counter()
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement templates run at least `threshold` times."""
+        return [
+            (statement, count)
+            for statement, count in self.statements.items()
+            if count >= threshold
+        ]
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    'request_stats', default=None
+)
+
+
+class RouteMetrics:
+    __slots__ = ('latency', 'queries', 'db_seconds', 'responses', 'repeated')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_seconds = Histogram(LATENCY_BUCKETS)
+        self.responses = defaultdict(int)
+        self.repeated = 0
+
+
+class Metrics:
+    """Per-route request metrics, keyed by method and route template so
+    the number of series stays bounded whatever paths clients request."""
+
+    def __init__(self):
+        self.routes: dict[tuple[str, str], RouteMetrics] = defaultdict(
+            RouteMetrics
+        )
+
+    def observe(  # noqa: PLR0913, PLR0917
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        stats: RequestStats,
+    ) -> None:
+        metrics = self.routes[method, route]
+        metrics.latency.observe(seconds)
+        metrics.queries.observe(stats.queries)
+        metrics.db_seconds.observe(stats.db_seconds)
+        metrics.responses[status] += 1
+
+        repeated = stats.repeated(settings.DATABASE_REPEATED_QUERY_THRESHOLD)
+        if repeated:
+            metrics.repeated += 1
+        for statement, count in repeated:
+            logger.warning(
+                'Possible N+1 in %s %s: statement ran %d times: %s',
+                method,
+                route,
+                count,
+                statement,
+            )
+
+    def clear(self) -> None:
+        self.routes.clear()
+
+
+settings = Settings()
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """ASGI middleware that times every HTTP request and records it,
+    with the queries it ran, under the template of the route that served
+    it. Requests no route matched are recorded as `unmatched`."""
+
+    def __init__(self, app, metrics: Metrics = metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get('route')
+            self.metrics.observe(
+                scope['method'],
+                getattr(route, 'path', 'unmatched'),
+                status,
+                perf_counter() - started,
+                stats,
+            )
+            _request_stats.reset(token)
+
+
+def _before_cursor_execute(  # noqa: PLR0913, PLR0917
+    conn, cursor, statement, params, context, many
+):
+    context._metrics_started = perf_counter()
+
+
+def _after_cursor_execute(  # noqa: PLR0913, PLR0917
+    conn, cursor, statement, params, context, many
+):
+    seconds = perf_counter() - context._metrics_started
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+        stats.statements[statement] += 1
+
+    if seconds >= settings.DATABASE_SLOW_QUERY_SECONDS:
+        logger.warning(
+            'Slow query (%.3fs): %s parameters=%s',
+            seconds,
+            statement,
+            parameter_shape(params),
+        )
+
+
+def parameter_shape(params) -> str:
+    """Describe bound parameters by name and type only, so logging them
+    never leaks the values themselves."""
+    if isinstance(params, dict):
+        return '{%s}' % ', '.join(
+            f'{name}: {type(value).__name__}' for name, value in params.items()
+        )
+
+    if isinstance(params, (list, tuple)):
+        if params and isinstance(params[0], (dict, list, tuple)):
+            return f'{len(params)} x {parameter_shape(params[0])}'
+        return '(%s)' % ', '.join(type(value).__name__ for value in params)
+
+    return type(params).__name__
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attribute the statements `engine` runs, and the time the database
+    took to answer them, to the request being served, and log those
+    slower than `DATABASE_SLOW_QUERY_SECONDS`."""
+    sync_engine = engine.sync_engine
+    if not event.contains(
+        sync_engine, 'before_cursor_execute', _before_cursor_execute
+    ):
+        event.listen(
+            sync_engine, 'before_cursor_execute', _before_cursor_execute
+        )
+        event.listen(
+            sync_engine, 'after_cursor_execute', _after_cursor_execute
+        )
+
+
+def _escape(value) -> str:
+    return (
+        str(value)
+        .replace('\\', r'\\')
+        .replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+class Exposition:
+    """Builds a Prometheus text format (0.0.4) document."""
+
+    def __init__(self):
+        self._families: dict[str, tuple[str, str, list[str]]] = {}
+
+    def sample(  # noqa: PLR0913, PLR0917
+        self,
+        name: str,
+        kind: str,
+        help: str,
+        labels: dict,
+        value: float,
+        suffix: str = '',
+    ) -> None:
+        samples = self._families.setdefault(name, (kind, help, []))[2]
+        label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        if label_text:
+            label_text = f'{{{label_text}}}'
+        samples.append(f'{name}{suffix}{label_text} {value}')
+
+    def histogram(
+        self, name: str, help: str, labels: dict, histogram: Histogram
+    ) -> None:
+        for bound, count in histogram.cumulative():
+            self.sample(
+                name,
+                'histogram',
+                help,
+                {**labels, 'le': bound},
+                count,
+                '_bucket',
+            )
+        self.sample(name, 'histogram', help, labels, histogram.sum, '_sum')
+        self.sample(name, 'histogram', help, labels, histogram.count, '_count')
+
+    def stats(self, prefix: str, help: str, labels: dict, stats: dict) -> None:
+        """Expose a component's `stats()` dict, one metric per key."""
+        for key, value in stats.items():
+            if key in COUNTER_STATS or key.endswith('_total'):
+                name = f'{prefix}_{key.removesuffix("_total")}_total'
+                self.sample(name, 'counter', help, labels, value)
+            else:
+                self.sample(f'{prefix}_{key}', 'gauge', help, labels, value)
+
+    def render(self) -> str:
+        lines = []
+        for name, (kind, help, samples) in self._families.items():
+            lines.append(f'# HELP {name} {help}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+def expose_requests(exposition: Exposition, metrics: Metrics = metrics):
+    for (method, route), route_metrics in sorted(metrics.routes.items()):
+        labels = {'method': method, 'route': route}
+        exposition.histogram(
+            'http_request_duration_seconds',
+            'Time to serve a request, by route template.',
+            labels,
+            route_metrics.latency,
+        )
+        exposition.histogram(
+            'http_request_db_queries',
+            'SQL statements run per request, by route template.',
+            labels,
+            route_metrics.queries,
+        )
+        exposition.histogram(
+            'http_request_db_seconds',
+            'Time spent waiting on SQL statements per request.',
+            labels,
+            route_metrics.db_seconds,
+        )
+        exposition.sample(
+            'http_request_repeated_queries_total',
+            'counter',
+            'Requests that repeated a statement often enough to suggest '
+            'an N+1 query.',
+            labels,
+            route_metrics.repeated,
+        )
+        for status, count in sorted(route_metrics.responses.items()):
+            exposition.sample(
+                'http_requests_total',
+                'counter',
+                'Requests served, by route template and status code.',
+                {**labels, 'status': status},
+                count,
+            )
@@ -1,5 +1,6 @@
 from .base import table_registry
 from .todo import Todo, TodoState
+from .todo_stats import TodoStats
 from .user import User
 
-__all__ = ['User', 'Todo', 'TodoState', 'table_registry']
+__all__ = ['User', 'Todo', 'TodoState', 'TodoStats', 'table_registry']
@@ -1,11 +1,13 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import ForeignKey, func, text
+from sqlalchemy import DDL, ForeignKey, Index, event, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import ModelBase, table_registry
 
+SEARCH_DOCUMENT = "to_tsvector('simple', title || ' ' || description)"
+
 
 class TodoState(str, Enum):
     NEW = 'NEW'
@@ -18,12 +20,31 @@ class TodoState(str, Enum):
 @table_registry.mapped_as_dataclass
 class Todo(ModelBase):
     __tablename__ = 'todos'
+    __table_args__ = (
+        Index('ix_todos_user_id_id', 'user_id', 'id'),
+        Index('ix_todos_user_id_state_id', 'user_id', 'state', 'id'),
+        Index('ix_todos_user_id_updated_at', 'user_id', 'updated_at'),
+        Index(
+            'ix_todos_title_trgm',
+            'title',
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+        ).ddl_if(dialect='postgresql'),
+        Index(
+            'ix_todos_description_trgm',
+            'description',
+            postgresql_using='gin',
+            postgresql_ops={'description': 'gin_trgm_ops'},
+        ).ddl_if(dialect='postgresql'),
+    )
+    __mapper_args__ = {'eager_defaults': True}
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     title: Mapped[str]
     description: Mapped[str]
     state: Mapped[TodoState]
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    version: Mapped[int] = mapped_column(init=False, server_default=text('1'))
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
@@ -32,3 +53,61 @@ class Todo(ModelBase):
         server_default=text('CURRENT_TIMESTAMP'),
         onupdate=func.now(),
     )
+
+
+event.listen(
+    table_registry.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(
+        dialect='postgresql'
+    ),
+)
+
+# Postgres keeps the search document in a stored generated column, so
+# matching and ranking never recompute to_tsvector per row. The column is
+# deliberately left unmapped: the ORM never reads or writes it.
+for statement in (
+    f"""ALTER TABLE todos ADD COLUMN search_document tsvector
+        GENERATED ALWAYS AS ({SEARCH_DOCUMENT}) STORED""",
+    """CREATE INDEX ix_todos_search_document ON todos
+        USING gin (search_document)""",
+):
+    event.listen(
+        Todo.__table__,
+        'after_create',
+        DDL(statement).execute_if(dialect='postgresql'),
+    )
+
+# SQLite has no trigram or tsvector indexes, so full-text search goes
+# through an FTS5 index over the todos table kept in sync by triggers.
+for statement in (
+    """CREATE VIRTUAL TABLE todos_fts USING fts5(
+        title, description, content='todos', content_rowid='id',
+        tokenize='trigram'
+    )""",
+    """CREATE TRIGGER todos_fts_insert AFTER INSERT ON todos BEGIN
+        INSERT INTO todos_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER todos_fts_delete AFTER DELETE ON todos BEGIN
+        INSERT INTO todos_fts (todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER todos_fts_update AFTER UPDATE ON todos BEGIN
+        INSERT INTO todos_fts (todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+):
+    event.listen(
+        Todo.__table__,
+        'after_create',
+        DDL(statement).execute_if(dialect='sqlite'),
+    )
+
+event.listen(
+    Todo.__table__,
+    'before_drop',
+    DDL('DROP TABLE IF EXISTS todos_fts').execute_if(dialect='sqlite'),
+)
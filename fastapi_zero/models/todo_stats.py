@@ -0,0 +1,112 @@
+from sqlalchemy import DDL, ForeignKey, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import ModelBase, table_registry
+from .todo import TodoState
+
+
+@table_registry.mapped_as_dataclass
+class TodoStats(ModelBase):
+    """How many todos a user has in each state.
+
+    Rows are maintained by triggers on `todos`, inside the transaction of
+    every insert, update and delete, so they can never drift from the
+    todos themselves. `fastapi_zero.stats.rebuild_todo_stats` recomputes
+    them from scratch.
+    """
+
+    __tablename__ = 'todo_stats'
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE'), primary_key=True
+    )
+    state: Mapped[TodoState] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(default=0)
+
+
+# Postgres applies the changes of a whole statement at once from its
+# transition tables, so a batch or a COPY costs one upsert per affected
+# state instead of one per row. Counters are upserted in key order, which
+# keeps concurrent writers from deadlocking on them.
+_PG_UPSERT = """
+    INSERT INTO todo_stats AS stats (user_id, state, count)
+    SELECT user_id, state, sum(delta) FROM ({deltas}) AS deltas
+    GROUP BY user_id, state
+    HAVING sum(delta) <> 0
+    ORDER BY user_id, state
+    ON CONFLICT (user_id, state)
+    DO UPDATE SET count = stats.count + excluded.count;
+"""
+_PG_DELTAS = {
+    'insert': 'SELECT user_id, state, 1 AS delta FROM new_todos',
+    'delete': 'SELECT user_id, state, -1 AS delta FROM old_todos',
+    'update': 'SELECT user_id, state, 1 AS delta FROM new_todos '
+    'UNION ALL SELECT user_id, state, -1 FROM old_todos',
+}
+_PG_TRANSITIONS = {
+    'insert': 'NEW TABLE AS new_todos',
+    'delete': 'OLD TABLE AS old_todos',
+    'update': 'NEW TABLE AS new_todos OLD TABLE AS old_todos',
+}
+PG_TRIGGERS = [
+    statement
+    for operation, deltas in _PG_DELTAS.items()
+    for statement in (
+        f"""CREATE OR REPLACE FUNCTION todo_stats_{operation}()
+        RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            {_PG_UPSERT.format(deltas=deltas)}
+            RETURN NULL;
+        END
+        $$""",
+        f"""CREATE TRIGGER todo_stats_{operation}
+        AFTER {operation.upper()} ON todos
+        REFERENCING {_PG_TRANSITIONS[operation]}
+        FOR EACH STATEMENT EXECUTE FUNCTION todo_stats_{operation}()""",
+    )
+]
+PG_DROP_FUNCTIONS = [
+    f'DROP FUNCTION IF EXISTS todo_stats_{operation}() CASCADE'
+    for operation in _PG_DELTAS
+]
+
+_SQLITE_UPSERT = """
+    INSERT INTO todo_stats (user_id, state, count)
+    VALUES ({row}.user_id, {row}.state, {delta})
+    ON CONFLICT (user_id, state)
+    DO UPDATE SET count = count + excluded.count;
+"""
+SQLITE_TRIGGERS = [
+    f"""CREATE TRIGGER todo_stats_insert AFTER INSERT ON todos BEGIN
+        {_SQLITE_UPSERT.format(row='new', delta=1)}
+    END""",
+    f"""CREATE TRIGGER todo_stats_delete AFTER DELETE ON todos BEGIN
+        {_SQLITE_UPSERT.format(row='old', delta=-1)}
+    END""",
+    f"""CREATE TRIGGER todo_stats_update AFTER UPDATE OF user_id, state
+        ON todos
+        WHEN old.user_id <> new.user_id OR old.state <> new.state BEGIN
+        {_SQLITE_UPSERT.format(row='old', delta=-1)}
+        {_SQLITE_UPSERT.format(row='new', delta=1)}
+    END""",
+]
+
+# The triggers live on `todos` but write to `todo_stats`, so they are
+# created once both tables exist.
+for dialect, statements in (
+    ('postgresql', PG_TRIGGERS),
+    ('sqlite', SQLITE_TRIGGERS),
+):
+    for statement in statements:
+        event.listen(
+            table_registry.metadata,
+            'after_create',
+            DDL(statement).execute_if(dialect=dialect),
+        )
+
+for statement in PG_DROP_FUNCTIONS:
+    event.listen(
+        table_registry.metadata,
+        'after_drop',
+        DDL(statement).execute_if(dialect='postgresql'),
+    )
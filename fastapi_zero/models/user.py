@@ -10,11 +10,13 @@ from .todo import Todo
 @table_registry.mapped_as_dataclass
 class User(ModelBase):
     __tablename__ = 'users'
+    __mapper_args__ = {'eager_defaults': True}
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     username: Mapped[str] = mapped_column(unique=True)
     email: Mapped[str] = mapped_column(unique=True)
     password_hash: Mapped[str]
+    version: Mapped[int] = mapped_column(init=False, server_default=text('1'))
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
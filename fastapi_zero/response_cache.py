@@ -0,0 +1,177 @@
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from math import inf
+from time import perf_counter, time
+from typing import Protocol
+from uuid import uuid4
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from fastapi_zero.cache import LRUCache
+from fastapi_zero.settings import Settings
+
+
+class CacheBackend(Protocol):
+    """Storage for serialized responses.
+
+    Backends only ever see opaque keys and bytes, so an external store
+    such as Redis or memcached can be plugged in by implementing these
+    three coroutines. `ttl=None` means the entry never expires.
+    """
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float | None) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+class MemoryBackend:
+    """Process-local backend bounded by LRU eviction."""
+
+    def __init__(self, maxsize: int):
+        self.entries = LRUCache(maxsize=maxsize, ttl=inf)
+
+    async def get(self, key: str) -> bytes | None:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float | None) -> None:
+        self.entries.set(key, value, ttl=inf if ttl is None else ttl)
+
+    async def delete(self, key: str) -> None:
+        self.entries.delete(key)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    """JSON body of a response together with its ETag, if any."""
+
+    body: bytes
+    etag: str | None = None
+
+    @classmethod
+    def of(cls, model: BaseModel, etag: str | None = None):
+        return cls(model.model_dump_json().encode(), etag)
+
+    @classmethod
+    def loads(cls, value: bytes):
+        etag, body = value.split(b'\n', 1)
+        return cls(body, etag.decode() or None)
+
+    def dumps(self) -> bytes:
+        return (self.etag or '').encode() + b'\n' + self.body
+
+    def to_response(self) -> Response:
+        headers = {'ETag': self.etag} if self.etag else None
+        return Response(
+            self.body, media_type='application/json', headers=headers
+        )
+
+
+class ResponseCache:
+    """Caches serialized responses per route on a pluggable backend.
+
+    Keys live under a namespace generation: invalidating a namespace only
+    replaces its generation token, which makes every key built from the
+    old token unreachable without scanning for them. Responses loaded
+    while a write was in flight are stored under the old token, so they
+    can never outlive the invalidation.
+
+    Tokens also record when they were issued. For
+    `read_your_writes_seconds` after an invalidation, replicas may not
+    have the write yet, so misses can be loaded from the primary instead.
+    """
+
+    def __init__(
+        self, backend: CacheBackend, read_your_writes_seconds: float = 0
+    ):
+        self.backend = backend
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self._stats = defaultdict(
+            lambda: {
+                'hits': 0,
+                'misses': 0,
+                'hit_seconds_total': 0.0,
+                'miss_seconds_total': 0.0,
+            }
+        )
+
+    async def generation(self, namespace: str) -> tuple[str, float]:
+        """Current token of `namespace` and the time it was invalidated,
+        0 if it never was."""
+        key = f'{namespace}:generation'
+        token = await self.backend.get(key)
+        if token is None:
+            token = f'{uuid4().hex}:0'.encode()
+            await self.backend.set(key, token, ttl=None)
+        generation, _, invalidated_at = token.decode().partition(':')
+        return generation, float(invalidated_at or 0)
+
+    async def invalidate(self, namespace: str) -> None:
+        await self.backend.set(
+            f'{namespace}:generation',
+            f'{uuid4().hex}:{time()}'.encode(),
+            ttl=None,
+        )
+
+    async def fetch(  # noqa: PLR0913, PLR0917
+        self,
+        route: str,
+        namespace: str,
+        key: str,
+        ttl: float,
+        load: Callable[[], Awaitable[CachedResponse]],
+        load_from_primary: Callable[[], Awaitable[CachedResponse]]
+        | None = None,
+    ) -> CachedResponse:
+        """Return the cached response for `key`, calling `load` and
+        caching its result on a miss. Exceptions raised by `load`, such as
+        a 404, are not cached.
+
+        Within `read_your_writes_seconds` of the namespace's invalidation,
+        misses call `load_from_primary` instead, if given, so that rows a
+        lagging replica returns are not cached under the new token.
+        """
+        started = perf_counter()
+        stats = self._stats[route]
+        generation, invalidated_at = await self.generation(namespace)
+        key = f'{namespace}:{generation}:{key}'
+
+        value = await self.backend.get(key)
+        if value is not None:
+            stats['hits'] += 1
+            stats['hit_seconds_total'] += perf_counter() - started
+            return CachedResponse.loads(value)
+
+        if (
+            load_from_primary is not None
+            and time() - invalidated_at < self.read_your_writes_seconds
+        ):
+            load = load_from_primary
+
+        try:
+            response = await load()
+            await self.backend.set(key, response.dumps(), ttl)
+            return response
+        finally:
+            stats['misses'] += 1
+            stats['miss_seconds_total'] += perf_counter() - started
+
+    def stats(self) -> dict[str, dict[str, int | float]]:
+        return {
+            route: {
+                **stats,
+                'hit_ratio': stats['hits']
+                / max(stats['hits'] + stats['misses'], 1),
+            }
+            for route, stats in self._stats.items()
+        }
+
+
+settings = Settings()
+response_cache = ResponseCache(
+    MemoryBackend(settings.RESPONSE_CACHE_MAX_SIZE),
+    settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+)
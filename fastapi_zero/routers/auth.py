@@ -10,15 +10,16 @@ from fastapi_zero.database import get_session
 from fastapi_zero.models import User
 from fastapi_zero.schemas import TokenResponse
 from fastapi_zero.security import (
+    Principal,
     create_access_token,
     get_current_user,
-    verify_password,
+    verify_password_async,
 )
 
 router = APIRouter(prefix='/auth', tags=['auth'])
 T_OAuth2Form = Annotated[OAuth2PasswordRequestForm, Depends()]
 T_Session = Annotated[AsyncSession, Depends(get_session)]
-T_CurrentUser = Annotated[User, Depends(get_current_user)]
+T_CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 
 @router.post('/login', status_code=HTTPStatus.OK, response_model=TokenResponse)
@@ -26,13 +27,16 @@ async def login(
     input: T_OAuth2Form,
     session: T_Session,
 ):
-    user = await session.scalar(
-        select(User).where(
+    result = await session.execute(
+        select(User.email, User.password_hash).where(
             (User.email == input.username) | (User.username == input.username)
         )
     )
+    user = result.first()
 
-    if not user or not verify_password(input.password, user.password_hash):
+    if not user or not await verify_password_async(
+        input.password, user.password_hash
+    ):
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
             detail='Invalid username or password',
@@ -0,0 +1,60 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from fastapi_zero import database
+from fastapi_zero.metrics import Exposition, expose_requests
+from fastapi_zero.response_cache import response_cache
+from fastapi_zero.security import password_executor, principal_cache
+
+router = APIRouter(tags=['metrics'])
+
+
+@router.get(
+    '/metrics', response_class=PlainTextResponse, include_in_schema=False
+)
+async def metrics():
+    exposition = Exposition()
+    expose_requests(exposition)
+    exposition.stats(
+        'principal_cache',
+        'Cache of authenticated principals.',
+        {},
+        principal_cache.stats(),
+    )
+    for route, stats in response_cache.stats().items():
+        exposition.stats(
+            'response_cache',
+            'Cache of serialized responses, by route.',
+            {'route': route},
+            stats,
+        )
+    exposition.stats(
+        'password_executor',
+        'Pool running password hashing.',
+        {},
+        password_executor.stats(),
+    )
+    engines = {
+        'primary': database.engine,
+        **{
+            f'replica_{index}': engine
+            for index, engine in enumerate(database.replicas.engines)
+        },
+    }
+    exposition.stats(
+        'db_recent_writers',
+        'Subjects reading from the primary after a write.',
+        {},
+        database.replicas.recent_writers.stats(),
+    )
+    for name, engine in engines.items():
+        exposition.stats(
+            'db_pool',
+            'Database connection pool, by engine.',
+            {'engine': name},
+            database.pool_stats(engine),
+        )
+
+    return PlainTextResponse(
+        exposition.render(), media_type='text/plain; version=0.0.4'
+    )
@@ -1,27 +1,62 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
 from fastapi.params import Depends
-from sqlalchemy import select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, insert, literal, select
+from sqlalchemy import delete as sql_delete
+from sqlalchemy import update as sql_update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fastapi_zero.database import get_session
-from fastapi_zero.models import Todo, User
+from fastapi_zero.etag import (
+    NOT_MODIFIED,
+    PRECONDITION_FAILED,
+    etag_matches,
+    if_match_versions,
+    make_etag,
+    not_modified,
+    version_etag,
+)
+from fastapi_zero.export import MEDIA_TYPES, ExportFormat, export_todos
+from fastapi_zero.fast_json import dumps, records
+from fastapi_zero.imports import import_todos
+from fastapi_zero.models import Todo, TodoState, TodoStats
+from fastapi_zero.pagination import next_page, paginate
+from fastapi_zero.response_cache import CachedResponse, response_cache
 from fastapi_zero.schemas import (
+    BatchTodoRequest,
+    BatchTodoResponse,
+    BatchUpdateTodoRequest,
     CreateTodoRequest,
+    ImportTodosResponse,
     ListTodoResponse,
     TodoFilter,
     TodoResponse,
+    TodoStatsResponse,
     UpdateTodoRequest,
 )
-from fastapi_zero.security import get_current_user
+from fastapi_zero.search import search_todos
+from fastapi_zero.security import (
+    Principal,
+    get_current_user,
+    get_user_read_session,
+    get_user_write_session,
+)
+from fastapi_zero.settings import Settings
 
+settings = Settings()
 router = APIRouter(prefix='/todos', tags=['todos'])
 
-T_Session = Annotated[AsyncSession, Depends(get_session)]
-T_CurrentUser = Annotated[User, Depends(get_current_user)]
+T_Session = Annotated[AsyncSession, Depends(get_user_write_session)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_user_read_session)]
+T_CurrentUser = Annotated[Principal, Depends(get_current_user)]
 T_Filter = Annotated[TodoFilter, Query()]
+T_IfNoneMatch = Annotated[str | None, Header()]
+T_IfMatch = Annotated[str | None, Header()]
+
+TODO_FIELDS = tuple(TodoResponse.model_fields)
+TODO_COLUMNS = [getattr(Todo, field) for field in TODO_FIELDS]
 
 
 @router.post('/', response_model=TodoResponse, status_code=201)
@@ -32,43 +67,365 @@ async def create_todo(
 ):
     todo = Todo(
         title=todo.title,
-        description=todo.description,
+        description=todo.description or '',
         state=todo.state,
         user_id=user.id,
     )
     session.add(todo)
     await session.commit()
-    await session.refresh(todo)
+    await response_cache.invalidate(f'todos:{user.id}')
 
     return todo
 
 
-@router.get('/', response_model=ListTodoResponse)
-async def find_all(user: T_CurrentUser, session: T_Session, filter: T_Filter):
-    query = select(Todo).where(Todo.user_id == user.id)
+@router.post('/batch', response_model=BatchTodoResponse)
+async def batch(
+    input: BatchTodoRequest,
+    user: T_CurrentUser,
+    session: T_Session,
+):
+    created = await _create_many(session, user.id, input.create)
+    updated = await _update_many(session, user.id, input.update)
+    deleted = await _delete_many(session, user.id, input.delete)
+    await session.commit()
+    await response_cache.invalidate(f'todos:{user.id}')
+
+    return {'create': created, 'update': updated, 'delete': deleted}
+
+
+async def _create_many(
+    session: AsyncSession, user_id: int, todos: list[CreateTodoRequest]
+):
+    if not todos:
+        return []
+
+    created = await session.scalars(
+        insert(Todo).returning(Todo, sort_by_parameter_order=True),
+        [
+            {
+                **todo.model_dump(),
+                'description': todo.description or '',
+                'user_id': user_id,
+            }
+            for todo in todos
+        ],
+    )
+    return [
+        {'id': todo.id, 'status': HTTPStatus.CREATED, 'todo': todo}
+        for todo in created
+    ]
+
+
+async def _update_many(
+    session: AsyncSession, user_id: int, todos: list[BatchUpdateTodoRequest]
+):
+    """Apply every update in one `UPDATE ... RETURNING`, picking each
+    row's new values with a `CASE` on its id.
+
+    Items with a `version` only apply to that version of their todo, like
+    `If-Match` on a single update. Items without fields are not written,
+    so their version stays; they are only read back.
+    """
+    if not todos:
+        return []
+
+    changed, unchanged = [], []
+    for todo in todos:
+        fields = (getattr(todo, f) for f in UpdateTodoRequest.model_fields)
+        if any(value is not None for value in fields):
+            changed.append(todo)
+        else:
+            unchanged.append(todo)
+
+    results = {}
+    if changed:
+        values = {}
+        for field in UpdateTodoRequest.model_fields:
+            column = getattr(Todo, field)
+            whens = {
+                todo.id: literal(getattr(todo, field), column.type)
+                for todo in changed
+                if getattr(todo, field) is not None
+            }
+            if whens:
+                values[field] = case(whens, value=Todo.id, else_=column)
+
+        updated = await session.scalars(
+            _scoped_many(sql_update(Todo), user_id, changed)
+            .values({**values, 'version': Todo.version + 1})
+            .returning(Todo)
+        )
+        results.update(
+            (todo.id, {'id': todo.id, 'status': HTTPStatus.OK, 'todo': todo})
+            for todo in updated
+        )
+
+    if unchanged:
+        current = await session.scalars(
+            _scoped_many(select(Todo), user_id, unchanged)
+        )
+        results.update(
+            (todo.id, {'id': todo.id, 'status': HTTPStatus.OK, 'todo': todo})
+            for todo in current
+        )
+
+    return await _resolve_misses(
+        session,
+        user_id,
+        [todo.id for todo in todos],
+        results,
+        'Not authorized to update this todo',
+    )
+
+
+def _scoped_many(query, user_id: int, todos: list[BatchUpdateTodoRequest]):
+    """Restrict a statement to the given todos of `user_id` and, for those
+    that carry a `version`, to that version."""
+    query = query.where(
+        Todo.id.in_([todo.id for todo in todos]), Todo.user_id == user_id
+    )
+    versions = {
+        todo.id: todo.version for todo in todos if todo.version is not None
+    }
+    if versions:
+        query = query.where(
+            Todo.version == case(versions, value=Todo.id, else_=Todo.version)
+        )
+    return query
+
+
+async def _delete_many(session: AsyncSession, user_id: int, ids: list[int]):
+    if not ids:
+        return []
+
+    deleted = await session.scalars(
+        sql_delete(Todo)
+        .where(Todo.id.in_(ids), Todo.user_id == user_id)
+        .returning(Todo.id)
+    )
+    results = {
+        todo_id: {'id': todo_id, 'status': HTTPStatus.NO_CONTENT}
+        for todo_id in deleted
+    }
+    return await _resolve_misses(
+        session, user_id, ids, results, 'Not authorized to delete this todo'
+    )
+
+
+async def _resolve_misses(  # noqa: PLR0913, PLR0917
+    session: AsyncSession,
+    user_id: int,
+    ids: list[int],
+    results: dict,
+    forbidden: str,
+):
+    """Fill in results for ids the ownership-scoped statement did not
+    touch, telling missing todos apart from other users' todos and from
+    the caller's own todos at another version."""
+    missing = [todo_id for todo_id in ids if todo_id not in results]
+    if missing:
+        owners = dict(
+            (
+                await session.execute(
+                    select(Todo.id, Todo.user_id).where(Todo.id.in_(missing))
+                )
+            ).all()
+        )
+        for todo_id in missing:
+            if todo_id not in owners:
+                results[todo_id] = {
+                    'id': todo_id,
+                    'status': HTTPStatus.NOT_FOUND,
+                    'detail': 'Todo not found',
+                }
+            elif owners[todo_id] != user_id:
+                results[todo_id] = {
+                    'id': todo_id,
+                    'status': HTTPStatus.FORBIDDEN,
+                    'detail': forbidden,
+                }
+            else:
+                results[todo_id] = {
+                    'id': todo_id,
+                    'status': HTTPStatus.PRECONDITION_FAILED,
+                    'detail': 'Todo was modified by another request',
+                }
+
+    return [results[todo_id] for todo_id in ids]
+
 
-    if filter.title:
-        query = query.filter(Todo.title.contains(filter.title))
+@router.get('/', response_model=ListTodoResponse, responses=NOT_MODIFIED)
+async def find_all(
+    user: T_CurrentUser,
+    session: T_ReadSession,
+    filter: T_Filter,
+    if_none_match: T_IfNoneMatch = None,
+):
+    async def load():
+        query = select(*TODO_COLUMNS, Todo.version).where(
+            Todo.user_id == user.id
+        )
+
+        if filter.title:
+            query = query.filter(Todo.title.contains(filter.title))
+
+        if filter.description:
+            query = query.filter(Todo.description.contains(filter.description))
+
+        if filter.state:
+            query = query.filter(Todo.state == filter.state)
+
+        if filter.q:
+            query = search_todos(query, filter.q, session.bind.dialect.name)
+            query = query.offset(filter.skip).limit(filter.limit)
+        else:
+            query = paginate(query, Todo.id, filter)
 
-    if filter.description:
-        query = query.filter(Todo.description.contains(filter.description))
+        todos = (await session.execute(query)).all()
 
-    if filter.state:
-        query = query.filter(Todo.state == filter.state)
+        next_cursor = None
+        if not filter.q:
+            todos, next_cursor = next_page(todos, filter)
 
-    todos = await session.scalars(
-        query.offset(filter.skip).limit(filter.limit)
+        # Whether another page follows is part of the body, too
+        etag = make_etag([
+            *((todo.id, todo.version) for todo in todos),
+            (0, next_cursor),
+        ])
+
+        if settings.FAST_JSON_RESPONSES:
+            return CachedResponse(
+                dumps({
+                    'todos': records(TODO_FIELDS, todos),
+                    'next_cursor': next_cursor,
+                }),
+                etag=etag,
+            )
+
+        page = ListTodoResponse.model_validate(
+            {'todos': todos, 'next_cursor': next_cursor},
+            from_attributes=True,
+        )
+        return CachedResponse.of(page, etag=etag)
+
+    cached = await response_cache.fetch(
+        'todos.find_all',
+        f'todos:{user.id}',
+        filter.model_dump_json(),
+        settings.RESPONSE_CACHE_TODOS_LIST_TTL_SECONDS,
+        load,
     )
-    return {'todos': todos.all()}
+    if etag_matches(if_none_match, cached.etag):
+        return not_modified(cached.etag)
 
+    return cached.to_response()
+
+
+@router.get('/stats', response_model=TodoStatsResponse)
+async def stats(user: T_CurrentUser, session: T_ReadSession):
+    counts = dict.fromkeys(TodoState, 0)
+    counts.update(
+        (
+            await session.execute(
+                select(TodoStats.state, TodoStats.count).where(
+                    TodoStats.user_id == user.id
+                )
+            )
+        ).all()
+    )
 
-@router.get('/{todo_id}', response_model=TodoResponse)
+    return {'total': sum(counts.values()), 'states': counts}
+
+
+@router.get(
+    '/export',
+    response_class=StreamingResponse,
+    responses={
+        HTTPStatus.OK.value: {
+            'content': {media_type: {} for media_type in MEDIA_TYPES.values()}
+        }
+    },
+)
+async def export(
+    user: T_CurrentUser,
+    session: T_ReadSession,
+    format: Annotated[ExportFormat, Query()] = 'ndjson',
+):
+    return StreamingResponse(
+        export_todos(
+            session, user.id, format, settings.TODOS_EXPORT_CHUNK_SIZE
+        ),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            'Content-Disposition': f'attachment; filename="todos.{format}"'
+        },
+    )
+
+
+@router.post(
+    '/import',
+    response_model=ImportTodosResponse,
+    openapi_extra={
+        'requestBody': {
+            'required': True,
+            'content': {media_type: {} for media_type in MEDIA_TYPES.values()},
+        }
+    },
+)
+async def import_(
+    request: Request,
+    user: T_CurrentUser,
+    session: T_Session,
+    format: Annotated[ExportFormat, Query()] = 'ndjson',
+):
+    try:
+        result = await import_todos(
+            session,
+            user.id,
+            request.stream(),
+            format,
+            settings.TODOS_IMPORT_BATCH_SIZE,
+            settings.TODOS_IMPORT_MAX_ERRORS,
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Upload must be UTF-8 encoded',
+        )
+
+    await session.commit()
+    await response_cache.invalidate(f'todos:{user.id}')
+
+    return result
+
+
+@router.get('/{todo_id}', response_model=TodoResponse, responses=NOT_MODIFIED)
 async def find(
     todo_id: int,
-    session: T_Session,
+    session: T_ReadSession,
     user: T_CurrentUser,
+    response: Response,
+    if_none_match: T_IfNoneMatch = None,
 ):
-    todo = await session.scalar(select(Todo).where(Todo.id == todo_id))
+    if if_none_match:
+        version = await session.scalar(
+            select(Todo.version).where(
+                Todo.id == todo_id, Todo.user_id == user.id
+            )
+        )
+        if version and etag_matches(if_none_match, version_etag(version)):
+            return not_modified(version_etag(version))
+
+    if settings.FAST_JSON_RESPONSES:
+        todo = (
+            await session.execute(
+                select(*TODO_COLUMNS, Todo.version, Todo.user_id).where(
+                    Todo.id == todo_id
+                )
+            )
+        ).first()
+    else:
+        todo = await session.scalar(select(Todo).where(Todo.id == todo_id))
 
     if not todo:
         raise HTTPException(
@@ -81,55 +438,105 @@ async def find(
             detail='Not authorized to access this todo',
         )
 
+    etag = version_etag(todo.version)
+    if settings.FAST_JSON_RESPONSES:
+        return CachedResponse(
+            dumps(dict(zip(TODO_FIELDS, todo))), etag=etag
+        ).to_response()
+
+    response.headers['ETag'] = etag
     return todo
 
 
-@router.put('/{todo_id}', response_model=TodoResponse)
-async def update(
+@router.put(
+    '/{todo_id}', response_model=TodoResponse, responses=PRECONDITION_FAILED
+)
+async def update(  # noqa: PLR0913, PLR0917
     todo_id: int,
     session: T_Session,
     user: T_CurrentUser,
     input: UpdateTodoRequest,
+    response: Response,
+    if_match: T_IfMatch = None,
 ):
-    todo = await session.scalar(select(Todo).where(Todo.id == todo_id))
-
-    if not todo:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND, detail='Todo not found'
+    query = select(Todo)
+    values = input.model_dump(exclude_unset=True)
+    if values:
+        query = (
+            sql_update(Todo)
+            .values({**values, 'version': Todo.version + 1})
+            .returning(Todo)
         )
 
-    if todo.user_id != user.id:
-        raise HTTPException(
-            status_code=HTTPStatus.FORBIDDEN,
-            detail='Not authorized to update this todo',
+    todo = await session.scalar(
+        _scoped(query, todo_id, user.id, if_match_versions(if_match))
+    )
+
+    if not todo:
+        await _raise_miss(
+            session, todo_id, user.id, 'Not authorized to update this todo'
         )
 
-    todo.update_fields(input)
-    session.add(todo)
     await session.commit()
-    await session.refresh(todo)
+    await response_cache.invalidate(f'todos:{user.id}')
 
+    response.headers['ETag'] = version_etag(todo.version)
     return todo
 
 
-@router.delete('/{todo_id}', status_code=HTTPStatus.NO_CONTENT)
+@router.delete(
+    '/{todo_id}',
+    status_code=HTTPStatus.NO_CONTENT,
+    responses=PRECONDITION_FAILED,
+)
 async def delete(
     todo_id: int,
     session: T_Session,
     user: T_CurrentUser,
+    if_match: T_IfMatch = None,
 ):
-    todo = await session.scalar(select(Todo).where(Todo.id == todo_id))
+    deleted = await session.scalar(
+        _scoped(
+            sql_delete(Todo), todo_id, user.id, if_match_versions(if_match)
+        ).returning(Todo.id)
+    )
 
-    if not todo:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND, detail='Todo not found'
+    if deleted is None:
+        await _raise_miss(
+            session, todo_id, user.id, 'Not authorized to delete this todo'
         )
 
-    if todo.user_id != user.id:
+    await session.commit()
+    await response_cache.invalidate(f'todos:{user.id}')
+
+
+def _scoped(query, todo_id: int, user_id: int, versions: list[int] | None):
+    """Restrict a statement to one todo of `user_id` and, for conditional
+    requests, to the versions `If-Match` allows."""
+    query = query.where(Todo.id == todo_id, Todo.user_id == user_id)
+    if versions is not None:
+        query = query.where(Todo.version.in_(versions))
+    return query
+
+
+async def _raise_miss(
+    session: AsyncSession, todo_id: int, user_id: int, forbidden: str
+):
+    """Raise the 404, 403 or 412 for a todo the scoped statement did not
+    touch. Only this rare path pays for the extra lookup."""
+    owner_id = await session.scalar(
+        select(Todo.user_id).where(Todo.id == todo_id)
+    )
+
+    if owner_id is None:
         raise HTTPException(
-            status_code=HTTPStatus.FORBIDDEN,
-            detail='Not authorized to delete this todo',
+            status_code=HTTPStatus.NOT_FOUND, detail='Todo not found'
         )
 
-    await session.delete(todo)
-    await session.commit()
+    if owner_id != user_id:
+        raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail=forbidden)
+
+    raise HTTPException(
+        status_code=HTTPStatus.PRECONDITION_FAILED,
+        detail='Todo was modified by another request',
+    )
@@ -1,13 +1,30 @@
+from functools import partial
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy import delete as sql_delete
 from sqlalchemy import select
+from sqlalchemy import update as sql_update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fastapi_zero.database import get_session
-from fastapi_zero.models import User
+from fastapi_zero.database import (
+    get_read_engine,
+    get_read_session,
+    get_session,
+    mark_write,
+)
+from fastapi_zero.etag import (
+    NOT_MODIFIED,
+    etag_matches,
+    not_modified,
+    version_etag,
+)
+from fastapi_zero.fast_json import dumps, records
+from fastapi_zero.models import Todo, User
+from fastapi_zero.pagination import next_page, paginate
+from fastapi_zero.response_cache import CachedResponse, response_cache
 from fastapi_zero.schemas import (
     CreateUserRequest,
     ListUserResponse,
@@ -15,12 +32,44 @@ from fastapi_zero.schemas import (
     UpdateUserRequest,
     UserResponse,
 )
-from fastapi_zero.security import get_current_user, get_password_hash
+from fastapi_zero.security import (
+    Principal,
+    get_current_user,
+    get_password_hash_async,
+    get_user_write_session,
+    principal_cache,
+)
+from fastapi_zero.settings import Settings
 
+settings = Settings()
 router = APIRouter(prefix='/users', tags=['users'])
+
+
+def _profile(user_id: int) -> str:
+    """Read-your-writes subject of a user's profile. Writes to it pin it
+    to the primary, whoever reads it next."""
+    return f'users:{user_id}'
+
+
+async def get_profile_read_session(user_id: int):
+    """Session for reading the profile of `user_id`, served by a replica
+    unless the profile was written recently."""
+    async with AsyncSession(
+        get_read_engine(_profile(user_id)), expire_on_commit=False
+    ) as session:
+        yield session
+
+
 T_Session = Annotated[AsyncSession, Depends(get_session)]
-T_CurrentUser = Annotated[User, Depends(get_current_user)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+T_ProfileSession = Annotated[AsyncSession, Depends(get_profile_read_session)]
+T_WriteSession = Annotated[AsyncSession, Depends(get_user_write_session)]
+T_CurrentUser = Annotated[Principal, Depends(get_current_user)]
 T_Pagination = Annotated[Pagination, Query()]
+T_IfNoneMatch = Annotated[str | None, Header()]
+
+USER_FIELDS = tuple(UserResponse.model_fields)
+USER_COLUMNS = [getattr(User, field) for field in USER_FIELDS]
 
 
 @router.post(
@@ -29,59 +78,124 @@ T_Pagination = Annotated[Pagination, Query()]
     response_model=UserResponse,
 )
 async def create(input: CreateUserRequest, session: T_Session):
-    user = await session.scalar(
-        select(User).where(
-            (User.email == input.email) | (User.username == input.username)
-        )
-    )
-    if user:
-        if user.username == input.username:
-            raise HTTPException(
-                status_code=HTTPStatus.CONFLICT,
-                detail='Username already registered',
-            )
-        elif user.email == input.email:
-            raise HTTPException(
-                status_code=HTTPStatus.CONFLICT,
-                detail='Email already registered',
-            )
-    hashed_password = get_password_hash(input.password)
+    await _check_conflict(session, input)
+    hashed_password = await get_password_hash_async(input.password)
     user = User(
         username=input.username,
         email=input.email,
         password_hash=hashed_password,
     )
     session.add(user)
-    await session.commit()
-    await session.refresh(user)
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        await _check_conflict(session, input)
+        raise
+
+    mark_write(user.email)
+    mark_write(_profile(user.id))
+    await response_cache.invalidate('users')
 
     return user
 
 
+async def _check_conflict(session: AsyncSession, input: CreateUserRequest):
+    """Raise a conflict if the username or the email is taken. Checked
+    before hashing the password, so duplicate sign-ups stay cheap, and
+    again when a concurrent sign-up wins the race to the insert."""
+    username = await session.scalar(
+        select(User.username)
+        .where((User.username == input.username) | (User.email == input.email))
+        .limit(1)
+    )
+    if username is not None:
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail='Username already registered'
+            if username == input.username
+            else 'Email already registered',
+        )
+
+
 @router.get(
     '/',
     status_code=HTTPStatus.OK,
     response_model=ListUserResponse,
 )
-async def find_all(session: T_Session, pagination: T_Pagination):
-    query = await session.scalars(
-        select(User).offset(pagination.skip).limit(pagination.limit)
+async def find_all(
+    session: T_ReadSession, primary: T_Session, pagination: T_Pagination
+):
+    async def load(session: AsyncSession):
+        query = await session.execute(
+            paginate(select(*USER_COLUMNS), User.id, pagination)
+        )
+        users, next_cursor = next_page(query.all(), pagination)
+        if settings.FAST_JSON_RESPONSES:
+            return CachedResponse(
+                dumps({
+                    'users': records(USER_FIELDS, users),
+                    'next_cursor': next_cursor,
+                })
+            )
+
+        return CachedResponse.of(
+            ListUserResponse(
+                users=[UserResponse.model_validate(user) for user in users],
+                next_cursor=next_cursor,
+            )
+        )
+
+    cached = await response_cache.fetch(
+        'users.find_all',
+        'users',
+        f'list:{pagination.skip}:{pagination.limit}:{pagination.cursor}',
+        settings.RESPONSE_CACHE_USERS_LIST_TTL_SECONDS,
+        partial(load, session),
+        load_from_primary=partial(load, primary),
     )
-    users = query.all()
-    return {'users': users}
+    return cached.to_response()
 
 
 @router.get(
     '/{user_id}',
     status_code=HTTPStatus.OK,
     response_model=UserResponse,
+    responses=NOT_MODIFIED,
 )
-async def find(user_id: int, session: T_Session):
-    user = await session.scalar(select(User).where(User.id == user_id))
-    if not user:
-        raise HTTPException(status_code=404, detail='User not found')
+async def find(
+    user_id: int,
+    session: T_ProfileSession,
+    if_none_match: T_IfNoneMatch = None,
+):
+    async def load():
+        user = (
+            await session.execute(
+                select(*USER_COLUMNS, User.version).where(User.id == user_id)
+            )
+        ).first()
+        if not user:
+            raise HTTPException(status_code=404, detail='User not found')
 
-    return user
+        etag = version_etag(user.version)
+        if settings.FAST_JSON_RESPONSES:
+            return CachedResponse(
+                dumps(dict(zip(USER_FIELDS, user))), etag=etag
+            )
+
+        return CachedResponse.of(UserResponse.model_validate(user), etag=etag)
+
+    cached = await response_cache.fetch(
+        'users.find',
+        'users',
+        str(user_id),
+        settings.RESPONSE_CACHE_USERS_FIND_TTL_SECONDS,
+        load,
+    )
+    if etag_matches(if_none_match, cached.etag):
+        return not_modified(cached.etag)
+
+    return cached.to_response()
 
 
 @router.put(
@@ -92,7 +206,7 @@ async def find(user_id: int, session: T_Session):
 async def update(
     user_id: int,
     input: UpdateUserRequest,
-    session: T_Session,
+    session: T_WriteSession,
     current_user: T_CurrentUser,
 ):
     if current_user.id != user_id:
@@ -101,23 +215,44 @@ async def update(
             detail='Not authorized to update this user',
         )
 
+    values = input.model_dump(exclude={'password'})
+    if input.password:
+        values['password_hash'] = await get_password_hash_async(input.password)
+
     try:
-        current_user.update_fields(input)
+        user = (
+            await session.execute(
+                sql_update(User)
+                .where(User.id == user_id)
+                .values({**values, 'version': User.version + 1})
+                .returning(User.id, User.username, User.email)
+            )
+        ).first()
         await session.commit()
-        await session.refresh(current_user)
-
-        return current_user
     except IntegrityError:
+        await session.rollback()
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail='Username or email already exists',
         )
 
+    if not user:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='User not found'
+        )
+
+    principal_cache.delete(current_user.email)
+    mark_write(user.email)
+    mark_write(_profile(user_id))
+    await response_cache.invalidate('users')
+
+    return user
+
 
 @router.delete('/{user_id}', status_code=HTTPStatus.NO_CONTENT)
 async def delete(
     user_id: int,
-    session: T_Session,
+    session: T_WriteSession,
     current_user: T_CurrentUser,
 ):
     if current_user.id != user_id:
@@ -126,5 +261,10 @@ async def delete(
             detail='Not authorized to delete this user',
         )
 
-    await session.delete(current_user)
+    await session.execute(sql_delete(Todo).where(Todo.user_id == user_id))
+    await session.execute(sql_delete(User).where(User.id == user_id))
     await session.commit()
+    principal_cache.delete(current_user.email)
+    mark_write(_profile(user_id))
+    await response_cache.invalidate('users')
+    await response_cache.invalidate(f'todos:{user_id}')
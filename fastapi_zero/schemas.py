@@ -1,13 +1,35 @@
 from typing import Optional
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    Field,
+    field_validator,
+    model_validator,
+)
 
 from fastapi_zero.models import TodoState
+from fastapi_zero.pagination import decode_cursor
 
 
 class Pagination(BaseModel):
     skip: int = Field(ge=0, default=0)
     limit: int = Field(gt=0, default=10)
+    cursor: str | None = None
+
+    @field_validator('cursor')
+    @classmethod
+    def validate_cursor(cls, cursor: str | None) -> str | None:
+        if cursor is not None:
+            decode_cursor(cursor)
+        return cursor
+
+    @model_validator(mode='after')
+    def validate_skip_or_cursor(self) -> 'Pagination':
+        if self.cursor and self.skip:
+            raise ValueError('skip and cursor are mutually exclusive')
+        return self
 
 
 class CreateUserRequest(BaseModel):
@@ -25,6 +47,7 @@ class UserResponse(BaseModel):
 
 class ListUserResponse(BaseModel):
     users: list[UserResponse]
+    next_cursor: str | None = None
 
 
 class UpdateUserRequest(BaseModel):
@@ -56,9 +79,70 @@ class TodoResponse(CreateTodoRequest):
 
 class ListTodoResponse(BaseModel):
     todos: list[TodoResponse]
+    next_cursor: str | None = None
+
+
+class TodoStatsResponse(BaseModel):
+    total: int
+    states: dict[TodoState, int]
+
+
+class BatchUpdateTodoRequest(UpdateTodoRequest):
+    id: int
+    version: Optional[int] = None
+
+
+class BatchTodoRequest(BaseModel):
+    create: list[CreateTodoRequest] = Field(
+        default_factory=list, max_length=500
+    )
+    update: list[BatchUpdateTodoRequest] = Field(
+        default_factory=list, max_length=500
+    )
+    delete: list[int] = Field(default_factory=list, max_length=500)
+
+    @model_validator(mode='after')
+    def validate_unique_ids(self) -> 'BatchTodoRequest':
+        update_ids = [todo.id for todo in self.update]
+        if len(set(update_ids)) != len(update_ids):
+            raise ValueError('update ids must be unique')
+        if len(set(self.delete)) != len(self.delete):
+            raise ValueError('delete ids must be unique')
+        return self
+
+
+class BatchTodoResult(BaseModel):
+    id: int
+    status: int
+    todo: TodoResponse | None = None
+    detail: str | None = None
+
+
+class BatchTodoResponse(BaseModel):
+    create: list[BatchTodoResult]
+    update: list[BatchTodoResult]
+    delete: list[BatchTodoResult]
+
+
+class ImportTodosError(BaseModel):
+    line: int
+    detail: str
+
+
+class ImportTodosResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: list[ImportTodosError]
 
 
 class TodoFilter(Pagination):
     title: str | None = Field(None, min_length=3, max_length=20)
     description: str | None = Field(None, min_length=3, max_length=20)
     state: TodoState | None = None
+    q: str | None = Field(None, min_length=3, max_length=100)
+
+    @model_validator(mode='after')
+    def validate_q_or_cursor(self) -> 'TodoFilter':
+        if self.q and self.cursor:
+            raise ValueError('search results are paginated with skip')
+        return self
@@ -0,0 +1,47 @@
+from sqlalchemy import Select, column, func, literal_column, or_, select, table
+
+from fastapi_zero.models import Todo
+
+todos_fts = table('todos_fts', column('rowid'), column('rank'))
+
+
+def _fts5_query(terms: str) -> str:
+    """Quote every term so user input is never parsed as FTS5 syntax.
+
+    The trigram tokenizer cannot match terms shorter than three
+    characters, so those are dropped unless nothing else is left.
+    """
+    words = terms.split()
+    words = [word for word in words if len(word) >= 3] or [terms]  # noqa: PLR2004
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def search_todos(query: Select, terms: str, dialect: str) -> Select:
+    """Restrict a select over `todos`, of entities or of columns, to rows
+    matching `terms`, best matches first.
+
+    Postgres matches against the generated `search_document` column and
+    its GIN index and ranks with `ts_rank`; SQLite matches against the
+    `todos_fts` FTS5 table and ranks with bm25. Other databases fall back
+    to an unranked substring scan.
+    """
+    if dialect == 'postgresql':
+        document = literal_column('todos.search_document')
+        tsquery = func.websearch_to_tsquery(literal_column("'simple'"), terms)
+        return query.where(document.bool_op('@@')(tsquery)).order_by(
+            func.ts_rank(document, tsquery).desc(), Todo.id
+        )
+
+    if dialect == 'sqlite':
+        matches = (
+            select(todos_fts.c.rowid, todos_fts.c.rank)
+            .where(literal_column('todos_fts').op('MATCH')(_fts5_query(terms)))
+            .subquery()
+        )
+        return query.join(matches, matches.c.rowid == Todo.id).order_by(
+            matches.c.rank, Todo.id
+        )
+
+    return query.where(
+        or_(Todo.title.contains(terms), Todo.description.contains(terms))
+    ).order_by(Todo.id)
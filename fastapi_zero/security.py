@@ -1,3 +1,5 @@
+from asyncio import QueueFull
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from http import HTTPStatus
 from zoneinfo import ZoneInfo
@@ -6,24 +8,64 @@ from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jwt import DecodeError, ExpiredSignatureError, decode, encode
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fastapi_zero.database import get_session
+from fastapi_zero.cache import LRUCache
+from fastapi_zero.database import get_read_engine, get_session, mark_write
+from fastapi_zero.executor import BoundedExecutor
 from fastapi_zero.models import User
 from fastapi_zero.settings import Settings
 
+
+def password_hasher(
+    time_cost: int, memory_cost: int, parallelism: int
+) -> PasswordHash:
+    """Argon2id hasher with the given cost. Each hash records the cost it
+    was made with, so hashes made under other parameters still verify."""
+    return PasswordHash((
+        Argon2Hasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+        ),
+    ))
+
+
 settings = Settings()
-pwd_context = PasswordHash.recommended()
+pwd_context = password_hasher(
+    settings.PASSWORD_HASH_TIME_COST,
+    settings.PASSWORD_HASH_MEMORY_COST,
+    settings.PASSWORD_HASH_PARALLELISM,
+)
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl='auth/login', refreshUrl='auth/refresh_token'
 )
+password_executor = BoundedExecutor(
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+principal_cache = LRUCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
 
 
-async def get_current_user(
-    session: AsyncSession = Depends(get_session),
-    token: str = Depends(oauth2_scheme),
-):
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Authenticated caller resolved from the access token.
+
+    Carries only the columns the auth path needs, so resolving it never
+    loads the full `User` entity nor its relationships."""
+
+    id: int
+    username: str
+    email: str
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
     credentials_exception = HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
         detail='Could not validate credentials',
@@ -45,14 +87,47 @@ async def get_current_user(
     except ExpiredSignatureError:
         raise credentials_exception
 
-    user = await session.scalar(
-        select(User).where(User.email == subject_email)
-    )
+    principal = principal_cache.get(subject_email)
+    if principal:
+        return principal
+
+    async with AsyncSession(get_read_engine(subject_email)) as session:
+        result = await session.execute(
+            select(User.id, User.username, User.email).where(
+                User.email == subject_email
+            )
+        )
+        row = result.first()
 
-    if not user:
+    if not row:
         raise credentials_exception
 
-    return user
+    principal = Principal(*row)
+    principal_cache.set(subject_email, principal)
+
+    return principal
+
+
+async def get_user_read_session(
+    current_user: Principal = Depends(get_current_user),
+):
+    """Session for read-only queries on behalf of the caller, served by a
+    replica unless the caller wrote recently."""
+    async with AsyncSession(
+        get_read_engine(current_user.email), expire_on_commit=False
+    ) as session:
+        yield session
+
+
+async def get_user_write_session(
+    current_user: Principal = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Primary session for a request that may write on behalf of the
+    caller. The caller is pinned to the primary before the write happens,
+    so its next reads cannot race replication."""
+    mark_write(current_user.email)
+    yield session
 
 
 def get_password_hash(password: str):
@@ -63,6 +138,27 @@ def verify_password(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def _run_password_executor(fn, *args):
+    try:
+        return await password_executor.run(fn, *args)
+    except QueueFull:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Too many concurrent password operations',
+            headers={'Retry-After': '1'},
+        )
+
+
+async def get_password_hash_async(password: str):
+    return await _run_password_executor(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str):
+    return await _run_password_executor(
+        verify_password, plain_password, hashed_password
+    )
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(tz=ZoneInfo('UTC')) + timedelta(
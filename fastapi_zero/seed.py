@@ -0,0 +1,202 @@
+"""Fill the database with generated users and todos for scale testing.
+
+Todos per user follow a Zipf distribution: a few users own a large share
+of all todos and most own a handful, as in real accounts. States, text
+lengths and timestamps are drawn from fixed distributions, and every
+user shares one password hash, computed once. Todos are written with
+`COPY` on Postgres and `executemany` elsewhere, committed every
+`--batch-size` rows. The same `--seed` generates the same data.
+
+    python -m fastapi_zero.seed --users 100000 --todos-per-user 20
+    python -m fastapi_zero.seed --users 1000 --skew 1.5 --password secret
+"""
+
+import argparse
+import asyncio
+import random
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fastapi_zero import database
+from fastapi_zero.models import Todo, TodoState, User
+from fastapi_zero.security import get_password_hash
+
+COPY_TODOS = (
+    'COPY todos (title, description, state, user_id, created_at, '
+    'updated_at) FROM STDIN'
+)
+TODO_COLUMNS = (
+    'title',
+    'description',
+    'state',
+    'user_id',
+    'created_at',
+    'updated_at',
+)
+
+STATES = list(TodoState)
+STATE_WEIGHTS = {
+    TodoState.NEW: 20,
+    TodoState.PENDING: 15,
+    TodoState.IN_PROGRESS: 10,
+    TodoState.DONE: 45,
+    TodoState.ARCHIVED: 10,
+}
+
+WORDS = (
+    'review update fix call email write plan book buy clean check send '
+    'prepare schedule finish read order pay renew cancel report draft '
+    'meeting invoice budget project team client doctor dentist groceries '
+    'car insurance taxes rent garden kitchen laundry gym flight hotel '
+    'birthday gift presentation slides contract release backlog server '
+    'database migration backup password account newsletter blog post '
+    'course homework exam library bank loan mortgage repair plumber '
+    'painter school parents friends weekend trip visa passport license'
+).split()
+
+# Todos are spread over the last year.
+HISTORY = timedelta(days=365)
+
+
+def todo_counts(
+    users: int, todos_per_user: float, skew: float, rng: random.Random
+) -> list[int]:
+    """Todos for each of `users` users, Zipf-distributed with exponent
+    `skew` and averaging `todos_per_user`, in random order."""
+    weights = [1 / rank**skew for rank in range(1, users + 1)]
+    scale = users * todos_per_user / sum(weights)
+    counts = [round(weight * scale) for weight in weights]
+    rng.shuffle(counts)
+    return counts
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choices(WORDS, k=words)).capitalize()
+
+
+def generate_todos(
+    user_id: int, count: int, rng: random.Random, now: datetime
+) -> Iterator[tuple]:
+    """Rows for `count` todos of `user_id`, in `TODO_COLUMNS` order.
+
+    Titles run a few words; descriptions are often empty and otherwise
+    log-normally long. Todos that left `NEW` were updated after they
+    were created.
+    """
+    states = rng.choices(STATES, weights=list(STATE_WEIGHTS.values()), k=count)
+    for state in states:
+        title = _text(rng, rng.randint(1, 8))
+        description = (
+            ''
+            if rng.random() < 0.2  # noqa: PLR2004
+            else _text(rng, min(int(rng.lognormvariate(2.5, 0.8)) + 1, 200))
+        )
+        created_at = now - HISTORY * rng.random()
+        updated_at = created_at
+        if state != TodoState.NEW:
+            updated_at += (now - created_at) * rng.random()
+        yield title, description, state, user_id, created_at, updated_at
+
+
+async def seed(  # noqa: PLR0913, PLR0917
+    session: AsyncSession,
+    users: int,
+    todos_per_user: float,
+    skew: float,
+    password: str,
+    batch_size: int,
+    rng: random.Random,
+    prefix: str = 'seed',
+) -> tuple[int, int]:
+    """Insert `users` users named `{prefix}{n}` and their todos,
+    committing every `batch_size` rows. Returns both counts."""
+    password_hash = get_password_hash(password)
+    now = datetime.now()
+    counts = todo_counts(users, todos_per_user, skew, rng)
+
+    user_ids = []
+    for start in range(0, users, batch_size):
+        ids = await session.scalars(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [
+                {
+                    'username': f'{prefix}{n}',
+                    'email': f'{prefix}{n}@example.com',
+                    'password_hash': password_hash,
+                }
+                for n in range(start, min(start + batch_size, users))
+            ],
+        )
+        user_ids.extend(ids)
+        await session.commit()
+
+    written = 0
+    batch = []
+    for user_id, count in zip(user_ids, counts):
+        for row in generate_todos(user_id, count, rng, now):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                await _write_todos(session, batch)
+                written += len(batch)
+                batch.clear()
+
+    if batch:
+        await _write_todos(session, batch)
+        written += len(batch)
+
+    return len(user_ids), written
+
+
+async def _write_todos(session: AsyncSession, rows: list[tuple]):
+    connection = await session.connection()
+
+    if connection.dialect.driver != 'psycopg':
+        await session.execute(
+            insert(Todo), [dict(zip(TODO_COLUMNS, row)) for row in rows]
+        )
+    else:
+        raw = await connection.get_raw_connection()
+        async with raw.driver_connection.cursor() as cursor:
+            async with cursor.copy(COPY_TODOS) as copy:
+                for row in rows:
+                    await copy.write_row((*row[:2], row[2].name, *row[3:]))
+
+    await session.commit()
+
+
+async def main(args: argparse.Namespace):
+    started = perf_counter()
+    async with AsyncSession(database.engine) as session:
+        users, todos = await seed(
+            session,
+            args.users,
+            args.todos_per_user,
+            args.skew,
+            args.password,
+            args.batch_size,
+            random.Random(args.seed),
+            args.prefix,
+        )
+
+    await database.engine.dispose()
+    elapsed = perf_counter() - started
+    print(
+        f'Seeded {users} users and {todos} todos in {elapsed:.1f}s '
+        f'({(users + todos) / elapsed:,.0f} rows/s)'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--todos-per-user', type=float, default=50)
+    parser.add_argument('--skew', type=float, default=1.0)
+    parser.add_argument('--password', default='password')
+    parser.add_argument('--prefix', default='seed')
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
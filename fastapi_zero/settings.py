@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -5,8 +7,37 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file='.env',
         env_file_encoding='utf-8',
+        env_parse_none_str='None',
     )
     DATABASE_URL: str
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_RECYCLE: int = -1
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_POOL_WARMUP: int | None = None
+    DATABASE_PREPARE_THRESHOLD: int | None = 5
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_READ_YOUR_WRITES_SECONDS: float = 5
+    DATABASE_READ_YOUR_WRITES_MAX_SUBJECTS: int = 100_000
+    DATABASE_SLOW_QUERY_SECONDS: float = 0.1
+    DATABASE_REPEATED_QUERY_THRESHOLD: int = 5
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = 'HS256'
     JWT_EXPIRE_IN_MINUTES: int = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+    RESPONSE_CACHE_MAX_SIZE: int = 10_000
+    RESPONSE_CACHE_USERS_LIST_TTL_SECONDS: float = 30
+    RESPONSE_CACHE_USERS_FIND_TTL_SECONDS: float = 60
+    RESPONSE_CACHE_TODOS_LIST_TTL_SECONDS: float = 30
+    FAST_JSON_RESPONSES: bool = False
+    TODOS_EXPORT_CHUNK_SIZE: int = 1_000
+    TODOS_IMPORT_BATCH_SIZE: int = 1_000
+    TODOS_IMPORT_MAX_ERRORS: int = 100
+    PASSWORD_HASH_EXECUTOR: Literal['thread', 'process'] = 'thread'
+    PASSWORD_HASH_MAX_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    PASSWORD_HASH_TIME_COST: int = 3
+    PASSWORD_HASH_MEMORY_COST: int = 65_536
+    PASSWORD_HASH_PARALLELISM: int = 4
@@ -0,0 +1,63 @@
+"""Rebuild the per-user todo counters from the todos themselves.
+
+The triggers on `todos` keep `todo_stats` exact, so this is only needed
+after the counters were touched by hand or the triggers were disabled,
+e.g. during a manual data fix. Safe to run against a live database.
+
+    python -m fastapi_zero.stats
+    python -m fastapi_zero.stats --user-id 42
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fastapi_zero import database
+from fastapi_zero.models import Todo, TodoStats
+
+
+async def rebuild_todo_stats(
+    session: AsyncSession, user_id: int | None = None
+) -> int:
+    """Recompute the counters of `user_id`, or of every user, and return
+    how many were written. Nothing is committed here.
+
+    On Postgres, writes to `todos` wait until the caller commits, so none
+    can land between clearing the counters and recounting.
+    """
+    if session.bind.dialect.name == 'postgresql':
+        await session.execute(text('LOCK TABLE todos IN SHARE MODE'))
+
+    stale = delete(TodoStats)
+    counts = select(Todo.user_id, Todo.state, func.count()).group_by(
+        Todo.user_id, Todo.state
+    )
+    if user_id is not None:
+        stale = stale.where(TodoStats.user_id == user_id)
+        counts = counts.where(Todo.user_id == user_id)
+
+    await session.execute(stale)
+    written = await session.scalars(
+        insert(TodoStats)
+        .from_select(['user_id', 'state', 'count'], counts)
+        .returning(TodoStats.user_id)
+    )
+    return len(written.all())
+
+
+async def main(user_id: int | None):
+    async with AsyncSession(database.engine) as session:
+        written = await rebuild_todo_stats(session, user_id)
+        await session.commit()
+
+    await database.engine.dispose()
+    print(f'Rebuilt {written} todo counters')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--user-id', type=int)
+    args = parser.parse_args()
+    asyncio.run(main(args.user_id))
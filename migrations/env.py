@@ -26,6 +26,19 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = table_registry.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip the full-text search objects, which are created by hand
+    for one dialect only and cannot be compared by autogenerate."""
+    if type_ == 'table' and name.startswith('todos_fts'):
+        return False
+    if type_ == 'index' and name.endswith(('_trgm', '_search_document')):
+        return False
+    if type_ == 'column' and name == 'search_document':
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -48,6 +61,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -56,7 +70,11 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 def do_run_migrations(connection): 
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
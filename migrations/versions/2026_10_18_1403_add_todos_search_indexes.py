@@ -0,0 +1,74 @@
+"""add todos search indexes
+
+Revision ID: c81d4f0b6e27
+Revises: a3f9c2e7d184
+Create Date: 2026-10-18 14:03:52.871046
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81d4f0b6e27'
+down_revision: Union[str, Sequence[str], None] = 'a3f9c2e7d184'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_DOCUMENT = "to_tsvector('simple', title || ' ' || description)"
+
+SQLITE_FTS = [
+    """CREATE VIRTUAL TABLE todos_fts USING fts5(
+        title, description, content='todos', content_rowid='id',
+        tokenize='trigram'
+    )""",
+    """CREATE TRIGGER todos_fts_insert AFTER INSERT ON todos BEGIN
+        INSERT INTO todos_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER todos_fts_delete AFTER DELETE ON todos BEGIN
+        INSERT INTO todos_fts (todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER todos_fts_update AFTER UPDATE ON todos BEGIN
+        INSERT INTO todos_fts (todos_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    "INSERT INTO todos_fts (todos_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index('ix_todos_title_trgm', 'todos', ['title'], unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+        op.create_index('ix_todos_description_trgm', 'todos', ['description'], unique=False, postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+        op.execute(f"ALTER TABLE todos ADD COLUMN search_document tsvector GENERATED ALWAYS AS ({SEARCH_DOCUMENT}) STORED")
+        op.create_index('ix_todos_search_document', 'todos', ['search_document'], unique=False, postgresql_using='gin')
+
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.drop_index('ix_todos_search_document', table_name='todos')
+        op.drop_column('todos', 'search_document')
+        op.drop_index('ix_todos_description_trgm', table_name='todos')
+        op.drop_index('ix_todos_title_trgm', table_name='todos')
+
+    elif dialect == 'sqlite':
+        for trigger in ('insert', 'delete', 'update'):
+            op.execute(f'DROP TRIGGER IF EXISTS todos_fts_{trigger}')
+        op.execute('DROP TABLE IF EXISTS todos_fts')
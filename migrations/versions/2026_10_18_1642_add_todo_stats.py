@@ -0,0 +1,120 @@
+"""add todo stats
+
+Revision ID: c7b1dad0fcc9
+Revises: cb74604119f6
+Create Date: 2026-10-18 16:42:31.600453
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7b1dad0fcc9'
+down_revision: Union[str, Sequence[str], None] = 'cb74604119f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TODO_STATES = ('NEW', 'PENDING', 'IN_PROGRESS', 'DONE', 'ARCHIVED')
+
+PG_DELTAS = {
+    'insert': ('NEW TABLE AS new_todos', 'SELECT user_id, state, 1 AS delta FROM new_todos'),
+    'delete': ('OLD TABLE AS old_todos', 'SELECT user_id, state, -1 AS delta FROM old_todos'),
+    'update': (
+        'NEW TABLE AS new_todos OLD TABLE AS old_todos',
+        'SELECT user_id, state, 1 AS delta FROM new_todos '
+        'UNION ALL SELECT user_id, state, -1 FROM old_todos',
+    ),
+}
+
+PG_TRIGGERS = [
+    statement
+    for operation, (transitions, deltas) in PG_DELTAS.items()
+    for statement in (
+        f"""CREATE OR REPLACE FUNCTION todo_stats_{operation}()
+        RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO todo_stats AS stats (user_id, state, count)
+            SELECT user_id, state, sum(delta) FROM ({deltas}) AS deltas
+            GROUP BY user_id, state
+            HAVING sum(delta) <> 0
+            ORDER BY user_id, state
+            ON CONFLICT (user_id, state)
+            DO UPDATE SET count = stats.count + excluded.count;
+            RETURN NULL;
+        END
+        $$""",
+        f"""CREATE TRIGGER todo_stats_{operation}
+        AFTER {operation.upper()} ON todos
+        REFERENCING {transitions}
+        FOR EACH STATEMENT EXECUTE FUNCTION todo_stats_{operation}()""",
+    )
+]
+
+SQLITE_UPSERT = """
+    INSERT INTO todo_stats (user_id, state, count)
+    VALUES ({row}.user_id, {row}.state, {delta})
+    ON CONFLICT (user_id, state)
+    DO UPDATE SET count = count + excluded.count;
+"""
+
+SQLITE_TRIGGERS = [
+    f"""CREATE TRIGGER todo_stats_insert AFTER INSERT ON todos BEGIN
+        {SQLITE_UPSERT.format(row='new', delta=1)}
+    END""",
+    f"""CREATE TRIGGER todo_stats_delete AFTER DELETE ON todos BEGIN
+        {SQLITE_UPSERT.format(row='old', delta=-1)}
+    END""",
+    f"""CREATE TRIGGER todo_stats_update AFTER UPDATE OF user_id, state
+        ON todos
+        WHEN old.user_id <> new.user_id OR old.state <> new.state BEGIN
+        {SQLITE_UPSERT.format(row='old', delta=-1)}
+        {SQLITE_UPSERT.format(row='new', delta=1)}
+    END""",
+]
+
+BACKFILL = """
+    INSERT INTO todo_stats (user_id, state, count)
+    SELECT user_id, state, count(*) FROM todos GROUP BY user_id, state
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    op.create_table('todo_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('state', sa.Enum(*TODO_STATES, name='todostate').with_variant(postgresql.ENUM(*TODO_STATES, name='todostate', create_type=False), 'postgresql'), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'state')
+    )
+
+    if dialect == 'postgresql':
+        op.execute('LOCK TABLE todos IN SHARE MODE')
+        for statement in PG_TRIGGERS:
+            op.execute(statement)
+
+    elif dialect == 'sqlite':
+        for statement in SQLITE_TRIGGERS:
+            op.execute(statement)
+
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    for operation in PG_DELTAS:
+        if dialect == 'postgresql':
+            op.execute(f'DROP TRIGGER IF EXISTS todo_stats_{operation} ON todos')
+            op.execute(f'DROP FUNCTION IF EXISTS todo_stats_{operation}()')
+        elif dialect == 'sqlite':
+            op.execute(f'DROP TRIGGER IF EXISTS todo_stats_{operation}')
+
+    op.drop_table('todo_stats')
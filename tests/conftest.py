@@ -9,25 +9,49 @@ from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from testcontainers.postgres import PostgresContainer
 
+from fastapi_zero import database
 from fastapi_zero.app import app
-from fastapi_zero.database import get_session
+from fastapi_zero.database import (
+    ReplicaRouter,
+    get_read_session,
+    get_session,
+)
+from fastapi_zero.metrics import instrument_engine
+from fastapi_zero.metrics import metrics as request_metrics
 from fastapi_zero.models import User, table_registry
-from fastapi_zero.security import get_password_hash
+from fastapi_zero.response_cache import MemoryBackend, response_cache
+from fastapi_zero.routers.users import get_profile_read_session
+from fastapi_zero.security import (
+    get_password_hash,
+    get_user_read_session,
+    principal_cache,
+)
 from fastapi_zero.settings import Settings
 
 
 @pytest.fixture
-def client(session):
+def client(session, engine, monkeypatch):
     """Fixture to provide a TestClient for FastAPI app."""
 
     def get_session_override():
         return session
 
+    instrument_engine(engine)
+    monkeypatch.setattr(database, 'engine', engine)
+    monkeypatch.setattr(database, 'replicas', ReplicaRouter([], 0, 1_000))
+    monkeypatch.setattr(response_cache, 'backend', MemoryBackend(1_000))
+
     with TestClient(app) as client:
         app.dependency_overrides[get_session] = get_session_override
+        app.dependency_overrides[get_read_session] = get_session_override
+        app.dependency_overrides[get_user_read_session] = get_session_override
+        app.dependency_overrides[get_profile_read_session] = (
+            get_session_override
+        )
         yield client
 
     app.dependency_overrides.clear()
+    principal_cache.clear()
 
 
 @pytest.fixture(scope='session')
@@ -53,6 +77,33 @@ async def session(engine):
     await engine.dispose()
 
 
+@pytest_asyncio.fixture
+async def sqlite_session():
+    """Fixture to provide a session on an in-memory SQLite database with
+    one user, for code paths that differ per dialect."""
+    engine = create_async_engine('sqlite+aiosqlite:///:memory:')
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(
+            User(username='user', email='user@test.com', password_hash='')
+        )
+        await session.commit()
+        yield session
+
+    await engine.dispose()
+
+
+@pytest.fixture(params=['session', 'sqlite_session'])
+def dialect_session(request):
+    """Fixture to run a test once on Postgres and once on SQLite, for code
+    paths that differ per dialect. Either database holds one user, id 1."""
+    if request.param == 'session':
+        request.getfixturevalue('user')
+    return request.getfixturevalue(request.param)
+
+
 @contextmanager
 def _mock_db_time(*, model, time=datetime.now()):
     def fake_time_hook(mapper, connection, target):
@@ -72,6 +123,59 @@ def mock_db_time():
     return _mock_db_time
 
 
+@pytest.fixture(autouse=True)
+def query_budget(request, monkeypatch):
+    """Fail tests marked `query_budget(n)` when any request they make
+    runs more than `n` SQL statements, listing the statements."""
+    marker = request.node.get_closest_marker('query_budget')
+    if marker is None:
+        yield
+        return
+
+    budget = marker.args[0]
+    overruns = []
+    observe = request_metrics.observe
+
+    def observe_within_budget(method, route, status, seconds, stats):  # noqa: PLR0913, PLR0917
+        if stats.queries > budget:
+            statements = '\n'.join(
+                f'  {count} x {statement}'
+                for statement, count in stats.statements.items()
+            )
+            overruns.append(
+                f'{method} {route} ran {stats.queries} statements, '
+                f'budget is {budget}:\n{statements}'
+            )
+        observe(method, route, status, seconds, stats)
+
+    monkeypatch.setattr(request_metrics, 'observe', observe_within_budget)
+    yield
+    if overruns:
+        pytest.fail('\n'.join(overruns), pytrace=False)
+
+
+@contextmanager
+def _count_queries(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(
+        engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+    )
+    yield statements
+    event.remove(
+        engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+    )
+
+
+@pytest.fixture
+def count_queries(engine):
+    """Fixture to record the SQL statements executed by the engine."""
+    return lambda: _count_queries(engine)
+
+
 @pytest_asyncio.fixture
 async def user(session):
     """Fixture to create user in the database."""
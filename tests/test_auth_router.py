@@ -1,7 +1,13 @@
+from asyncio import QueueFull
 from http import HTTPStatus
 
+import pytest
 from freezegun import freeze_time
 
+from fastapi_zero.security import password_executor
+
+pytestmark = pytest.mark.query_budget(3)
+
 
 def test_login_should_return_200(client, user):
     input = {
@@ -96,3 +102,17 @@ def test_token_expired_dont_refresh_should_return_401(client, user):
         )
         assert response.status_code == HTTPStatus.UNAUTHORIZED
         assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_login_password_pool_full_should_return_503(client, user, monkeypatch):
+    async def run(*args):
+        raise QueueFull
+
+    monkeypatch.setattr(password_executor, 'run', run)
+
+    response = client.post(
+        '/auth/login',
+        data={'username': user.email, 'password': 'securepassword'},
+    )
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['Retry-After'] == '1'
@@ -0,0 +1,54 @@
+from freezegun import freeze_time
+
+from fastapi_zero.cache import LRUCache
+
+
+def test_cache_get_should_count_hits_and_misses():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_should_evict_least_recently_used():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+    assert cache.evictions == 1
+
+
+def test_cache_entry_should_expire_after_ttl():
+    cache = LRUCache(maxsize=2, ttl=60)
+
+    with freeze_time('2025-10-23 12:00:00') as frozen:
+        cache.set('a', 1)
+        frozen.tick(61)
+
+        assert cache.get('a') is None
+        assert cache.expirations == 1
+        assert len(cache) == 0
+
+
+def test_cache_delete_should_remove_entry():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.delete('a')
+    cache.delete('missing')
+
+    assert cache.stats() == {
+        'size': 0,
+        'maxsize': 2,
+        'hits': 0,
+        'misses': 0,
+        'evictions': 0,
+        'expirations': 0,
+    }
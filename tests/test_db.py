@@ -1,10 +1,27 @@
+import asyncio
+import re
 from dataclasses import asdict
+from http import HTTPStatus
 
 import pytest
-from sqlalchemy import select
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fastapi_zero.models import Todo, User
+from fastapi_zero import database
+from fastapi_zero.app import app
+from fastapi_zero.database import (
+    InstrumentedPool,
+    ReplicaRouter,
+    create_engine,
+    pool_stats,
+    warm_up,
+)
+from fastapi_zero.models import Todo, TodoState, User, table_registry
+from fastapi_zero.pagination import encode_cursor
+from fastapi_zero.response_cache import MemoryBackend, response_cache
+from fastapi_zero.security import create_access_token, principal_cache
+from fastapi_zero.settings import Settings
 
 
 @pytest.mark.asyncio
@@ -25,6 +42,7 @@ async def test_create_user(session: AsyncSession, mock_db_time):
             'username': 'testuser',
             'email': 'user@test.com',
             'password_hash': 'hashedpassword123',
+            'version': 1,
             'created_at': mock_time,
             'updated_at': mock_time,
             'todos': [],
@@ -50,6 +68,7 @@ async def test_create_todo(session, user, mock_db_time):
             'description': 'This is a test todo item.',
             'state': 'NEW',
             'user_id': user.id,
+            'version': 1,
             'created_at': mock_time,
             'updated_at': mock_time,
         }
@@ -71,3 +90,259 @@ async def test_user_todo_relationship(session, user):
     user = await session.scalar(select(User).where(User.id == user.id))
 
     assert user.todos == [todo]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'params',
+    [
+        {},
+        {'state': 'DONE'},
+        {'title': 'Todo'},
+        {'cursor': encode_cursor(1)},
+    ],
+)
+async def test_list_todos_should_not_scan_todos_table(  # noqa: PLR0913, PLR0917
+    client, engine, session, user, token, params
+):
+    session.add(
+        Todo(title='Todo', description='', state='DONE', user_id=user.id)
+    )
+    await session.commit()
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, *args):
+        if 'FROM todos' in statement:
+            statements.append((statement, parameters))
+
+    event.listen(
+        engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+    )
+    client.get(
+        '/todos', params=params, headers={'Authorization': f'Bearer {token}'}
+    )
+    event.remove(
+        engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+    )
+
+    [(statement, parameters)] = statements
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql('SET enable_seqscan = off')
+        plan = await conn.exec_driver_sql(f'EXPLAIN {statement}', parameters)
+        plan = '\n'.join(plan.scalars())
+
+    assert 'Seq Scan on todos' not in plan
+    assert re.search(r'Index Cond: .*user_id', plan), plan
+
+
+def test_create_engine_should_apply_pool_settings(engine):
+    settings = Settings(
+        DATABASE_URL=engine.url.render_as_string(hide_password=False),
+        DATABASE_POOL_SIZE=3,
+        DATABASE_MAX_OVERFLOW=2,
+        DATABASE_POOL_TIMEOUT=1.5,
+        DATABASE_POOL_RECYCLE=600,
+        DATABASE_POOL_PRE_PING=True,
+        DATABASE_PREPARE_THRESHOLD=None,
+    )
+    pool = create_engine(settings).sync_engine.pool
+
+    assert isinstance(pool, InstrumentedPool)
+    assert pool.size() == 3  # noqa: PLR2004
+    assert pool._max_overflow == 2  # noqa: PLR2004
+    assert pool._timeout == 1.5  # noqa: PLR2004
+    assert pool._recycle == 600  # noqa: PLR2004
+    assert pool._pre_ping
+
+
+def test_create_engine_in_memory_sqlite_should_keep_static_pool():
+    settings = Settings(DATABASE_URL='sqlite+aiosqlite:///:memory:')
+
+    assert pool_stats(create_engine(settings)) == {}
+
+
+@pytest.mark.asyncio
+async def test_warm_up_should_fill_pool_and_record_checkouts(engine):
+    settings = Settings(
+        DATABASE_URL=engine.url.render_as_string(hide_password=False),
+        DATABASE_POOL_SIZE=3,
+    )
+    instrumented = create_engine(settings)
+
+    await warm_up(instrumented, 3)
+    stats = pool_stats(instrumented)
+    await instrumented.dispose()
+
+    assert stats['checked_in'] == 3  # noqa: PLR2004
+    assert stats['checked_out'] == 0
+    assert stats['checkouts'] == 3  # noqa: PLR2004
+    assert stats['checkout_wait_seconds_max'] > 0
+
+
+def test_app_lifespan_should_warm_up_pool(client, engine):
+    assert engine.sync_engine.pool.checkedin() >= Settings().DATABASE_POOL_SIZE
+
+
+def test_replica_router_should_round_robin_and_pin_recent_writers():
+    first, second = object(), object()
+    router = ReplicaRouter(
+        [first, second], read_your_writes_seconds=60, max_subjects=2
+    )
+
+    assert [router.pick('alice@test.com') for _ in range(3)] == [
+        first,
+        second,
+        first,
+    ]
+
+    router.mark_write('alice@test.com')
+
+    assert router.pick('alice@test.com') is None
+    assert router.pick('bob@test.com') is second
+    assert router.pick() is first
+
+    router.mark_write('bob@test.com')
+    router.mark_write('carol@test.com')
+
+    assert router.pick('alice@test.com') is second
+    assert router.pick('bob@test.com') is None
+    assert router.recent_writers.stats()['evictions'] == 1
+
+
+def test_replica_router_without_replicas_should_read_from_primary():
+    assert (
+        ReplicaRouter(
+            [], read_your_writes_seconds=60, max_subjects=1_000
+        ).pick()
+        is None
+    )
+
+
+async def _seed(engine, users, todos):
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+        await conn.execute(insert(User), users)
+        await conn.execute(insert(Todo), todos)
+    await engine.dispose()
+
+
+def test_reads_should_use_replica_until_the_caller_writes(
+    tmp_path, monkeypatch
+):
+    settings = Settings()
+    primary = create_engine(settings, f'sqlite+aiosqlite:///{tmp_path}/p.db')
+    replica = create_engine(settings, f'sqlite+aiosqlite:///{tmp_path}/r.db')
+    alice = {
+        'id': 1,
+        'username': 'alice',
+        'email': 'alice@test.com',
+        'password_hash': 'x',
+    }
+    bob = {**alice, 'id': 2, 'username': 'bob', 'email': 'bob@test.com'}
+    todo = {'user_id': 1, 'description': '', 'state': TodoState.NEW}
+    asyncio.run(_seed(primary, [alice], [{**todo, 'title': 'primary'}]))
+    asyncio.run(_seed(replica, [alice, bob], [{**todo, 'title': 'replica'}]))
+
+    monkeypatch.setattr(database, 'engine', primary)
+    monkeypatch.setattr(
+        database, 'replicas', ReplicaRouter([replica], 60, 1_000)
+    )
+    monkeypatch.setattr(response_cache, 'backend', MemoryBackend(100))
+    token = create_access_token({'sub': alice['email']})
+    headers = {'Authorization': f'Bearer {token}'}
+
+    with TestClient(app) as client:
+        replicated_user = client.get('/users/2')
+        before = client.get('/todos/', headers=headers)
+        created = client.post(
+            '/todos/',
+            headers=headers,
+            json={'title': 'new', 'description': '', 'state': TodoState.NEW},
+        )
+        after = client.get('/todos/', headers=headers)
+    principal_cache.clear()
+
+    assert replicated_user.json()['username'] == 'bob'
+    assert [t['title'] for t in before.json()['todos']] == ['replica']
+    assert created.status_code == HTTPStatus.CREATED
+    assert [t['title'] for t in after.json()['todos']] == ['primary', 'new']
+
+
+def test_profile_reads_should_use_primary_after_the_profile_changes(
+    tmp_path, monkeypatch
+):
+    settings = Settings()
+    primary = create_engine(settings, f'sqlite+aiosqlite:///{tmp_path}/p.db')
+    replica = create_engine(settings, f'sqlite+aiosqlite:///{tmp_path}/r.db')
+    alice = {
+        'id': 1,
+        'username': 'alice',
+        'email': 'alice@test.com',
+        'password_hash': 'x',
+    }
+    todo = {'user_id': 1, 'title': 't', 'description': '', 'state': 'NEW'}
+    asyncio.run(_seed(primary, [alice], [todo]))
+    asyncio.run(_seed(replica, [alice], [todo]))
+
+    monkeypatch.setattr(database, 'engine', primary)
+    monkeypatch.setattr(
+        database, 'replicas', ReplicaRouter([replica], 60, 1_000)
+    )
+    monkeypatch.setattr(response_cache, 'backend', MemoryBackend(100))
+    token = create_access_token({'sub': alice['email']})
+
+    with TestClient(app) as client:
+        updated = client.put(
+            '/users/1',
+            headers={'Authorization': f'Bearer {token}'},
+            json={'username': 'alice2', 'email': alice['email']},
+        )
+        # Anonymous, so not pinned by the caller's own writes
+        found = client.get('/users/1')
+    principal_cache.clear()
+
+    assert updated.status_code == HTTPStatus.OK
+    assert found.json()['username'] == 'alice2'
+
+
+def test_user_list_should_not_cache_replica_reads_after_a_write(
+    tmp_path, monkeypatch
+):
+    settings = Settings()
+    primary = create_engine(settings, f'sqlite+aiosqlite:///{tmp_path}/p.db')
+    replica = create_engine(settings, f'sqlite+aiosqlite:///{tmp_path}/r.db')
+    alice = {
+        'id': 1,
+        'username': 'alice',
+        'email': 'alice@test.com',
+        'password_hash': 'x',
+    }
+    todo = {'user_id': 1, 'title': 't', 'description': '', 'state': 'NEW'}
+    asyncio.run(_seed(primary, [alice], [todo]))
+    # The replica has not caught up with any write made during the test
+    asyncio.run(_seed(replica, [alice], [todo]))
+
+    monkeypatch.setattr(database, 'engine', primary)
+    monkeypatch.setattr(
+        database, 'replicas', ReplicaRouter([replica], 60, 1_000)
+    )
+    monkeypatch.setattr(response_cache, 'backend', MemoryBackend(100))
+    monkeypatch.setattr(response_cache, 'read_your_writes_seconds', 60)
+    token = create_access_token({'sub': alice['email']})
+
+    with TestClient(app) as client:
+        client.put(
+            '/users/1',
+            headers={'Authorization': f'Bearer {token}'},
+            json={'username': 'alice2', 'email': alice['email']},
+        )
+        after_write = client.get('/users/')
+        cached = client.get('/users/')
+        monkeypatch.setattr(response_cache, 'read_your_writes_seconds', 0)
+        after_window = client.get('/users/', params={'limit': 5})
+    principal_cache.clear()
+
+    assert after_write.json()['users'][0]['username'] == 'alice2'
+    assert cached.json() == after_write.json()
+    assert after_window.json()['users'][0]['username'] == 'alice'
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import pytest
+
+from fastapi_zero.etag import (
+    etag_matches,
+    if_match_versions,
+    make_etag,
+    version_etag,
+)
+
+UPDATED_AT = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def test_make_etag_should_depend_on_every_version():
+    etag = make_etag([(1, UPDATED_AT), (2, UPDATED_AT)])
+
+    assert etag.startswith('"')
+    assert etag.endswith('"')
+    assert etag == make_etag([(1, UPDATED_AT), (2, UPDATED_AT)])
+    assert etag != make_etag([(1, UPDATED_AT)])
+    assert etag != make_etag([(2, UPDATED_AT), (1, UPDATED_AT)])
+    assert etag != make_etag([(1, UPDATED_AT), (2, datetime(2026, 1, 2))])
+
+
+@pytest.mark.parametrize(
+    ('header', 'expected'),
+    [
+        (None, False),
+        ('', False),
+        ('"other"', False),
+        ('"etag"', True),
+        ('W/"etag"', True),
+        ('"other", "etag"', True),
+        ('*', True),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"etag"') is expected
+
+
+@pytest.mark.parametrize(
+    ('header', 'expected'),
+    [
+        (None, None),
+        ('*', None),
+        ('"3"', [3]),
+        ('W/"3"', []),
+        ('"abc"', []),
+        ('"3", "4"', [3, 4]),
+    ],
+)
+def test_if_match_versions(header, expected):
+    assert if_match_versions(header) == expected
+
+
+def test_version_etag_should_round_trip():
+    assert if_match_versions(version_etag(5)) == [5]
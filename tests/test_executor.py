@@ -0,0 +1,51 @@
+import asyncio
+import threading
+from asyncio import QueueFull
+
+import pytest
+
+from fastapi_zero.executor import BoundedExecutor
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('kind', ['thread', 'process'])
+async def test_executor_run_should_return_result(kind):
+    executor = BoundedExecutor(kind, max_workers=1, max_queue=1)
+
+    assert await executor.run(pow, 2, 10) == 1024  # noqa: PLR2004
+    assert executor.stats()['completed'] == 1
+
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_should_reject_when_queue_is_full():
+    executor = BoundedExecutor('thread', max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    running = asyncio.create_task(executor.run(release.wait))
+    queued = asyncio.create_task(executor.run(release.wait))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(QueueFull):
+        await executor.run(release.wait)
+
+    stats = executor.stats()
+    assert stats['active'] == 1
+    assert stats['queue_depth'] == 1
+    assert stats['rejected'] == 1
+
+    release.set()
+    await asyncio.gather(running, queued)
+
+    stats = executor.stats()
+    assert stats['queue_depth'] == 0
+    assert stats['completed'] == 2  # noqa: PLR2004
+    assert stats['wait_seconds_max'] > 0
+
+    executor.shutdown()
+
+
+def test_executor_with_unknown_kind_should_raise():
+    with pytest.raises(ValueError, match='Unknown executor kind'):
+        BoundedExecutor('fiber', max_workers=1, max_queue=1)
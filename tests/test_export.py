@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from fastapi_zero.export import export_todos
+from fastapi_zero.models import Todo, TodoState
+
+
+@pytest.mark.asyncio
+async def test_export_todos_should_yield_one_chunk_per_partition(
+    session, user, other_user
+):
+    session.add_all([
+        Todo(
+            title=f'Todo {i}',
+            description='',
+            state=TodoState.NEW,
+            user_id=user.id,
+        )
+        for i in range(5)
+    ])
+    session.add(
+        Todo(title='Other', description='', state='NEW', user_id=other_user.id)
+    )
+    await session.commit()
+
+    chunks = [
+        chunk async for chunk in export_todos(session, user.id, 'ndjson', 2)
+    ]
+
+    assert len(chunks) == 3  # noqa: PLR2004
+    rows = [json.loads(line) for line in b''.join(chunks).splitlines()]
+    assert [row['title'] for row in rows] == [f'Todo {i}' for i in range(5)]
+    assert rows[0] == {
+        'title': 'Todo 0',
+        'description': '',
+        'state': 'NEW',
+        'id': rows[0]['id'],
+    }
+
+
+@pytest.mark.asyncio
+async def test_export_todos_as_csv_should_start_with_header(session, user):
+    todo = Todo(title='a, "b"', description='c', state='DONE', user_id=user.id)
+    session.add(todo)
+    await session.commit()
+
+    chunks = [
+        chunk async for chunk in export_todos(session, user.id, 'csv', 100)
+    ]
+
+    assert b''.join(chunks).decode().splitlines() == [
+        'title,description,state,id',
+        f'"a, ""b""",c,DONE,{todo.id}',
+    ]
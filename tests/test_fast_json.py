@@ -0,0 +1,35 @@
+import pytest
+
+from fastapi_zero import fast_json
+from fastapi_zero.models import TodoState
+from fastapi_zero.schemas import ListTodoResponse
+
+
+@pytest.mark.parametrize('encoder', ['orjson', 'json'])
+def test_dumps_should_match_model_dump_json(encoder, monkeypatch):
+    if encoder == 'json':
+        monkeypatch.setattr(fast_json, 'orjson', None)
+    else:
+        pytest.importorskip('orjson')
+    rows = [
+        ('Café ☕', None, TodoState.DONE, 1),
+        ('"quoted"\n', 'x', TodoState.NEW, 2),
+    ]
+    content = {
+        'todos': fast_json.records(
+            ['title', 'description', 'state', 'id'], rows
+        ),
+        'next_cursor': 'abc',
+    }
+
+    assert (
+        fast_json.dumps(content)
+        == ListTodoResponse.model_validate(content).model_dump_json().encode()
+    )
+
+
+def test_records_should_drop_trailing_columns():
+    assert fast_json.records(['id'], [(1, 7), (2, 8)]) == [
+        {'id': 1},
+        {'id': 2},
+    ]
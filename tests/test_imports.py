@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import select
+
+from fastapi_zero.imports import import_todos
+from fastapi_zero.models import Todo, TodoState
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+NDJSON = (
+    '{"title": "Café", "description": "ünïcode", "state": "DONE"}\n'
+    '\n'
+    '{"title": "No description"}\n'
+    '{"description": "missing title"}\n'
+    'not json\n'
+    '{"title": "Last", "state": "PENDING"}'
+).encode()
+
+
+@pytest.mark.asyncio
+async def test_import_ndjson(dialect_session):
+    session = dialect_session
+    result = await import_todos(
+        session, 1, _chunks(NDJSON, 7), 'ndjson', 2, 100
+    )
+    await session.commit()
+
+    assert result['imported'] == 3  # noqa: PLR2004
+    assert result['failed'] == 2  # noqa: PLR2004
+    assert [error['line'] for error in result['errors']] == [4, 5]
+    assert result['errors'][0]['detail'] == 'title: Field required'
+    todos = (await session.scalars(select(Todo).order_by(Todo.id))).all()
+    assert [(t.title, t.description, t.state) for t in todos] == [
+        ('Café', 'ünïcode', TodoState.DONE),
+        ('No description', '', TodoState.NEW),
+        ('Last', '', TodoState.PENDING),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_csv_should_allow_quoted_newlines(sqlite_session):
+    data = (
+        'title,description,state\n'
+        'One,"first\nsecond ""line""",NEW\n'
+        'Two,,BOGUS\n'
+        'Three,only two fields\n'
+        'Four,,DONE\n'
+        '"Five,unterminated\n'
+    ).encode()
+
+    result = await import_todos(
+        sqlite_session, 1, _chunks(data, 5), 'csv', 100, 1
+    )
+
+    assert result['imported'] == 2  # noqa: PLR2004
+    assert result['failed'] == 3  # noqa: PLR2004
+    assert result['errors'] == [
+        {
+            'line': 4,
+            'detail': "state: Input should be 'NEW', 'PENDING', "
+            "'IN_PROGRESS', 'DONE' or 'ARCHIVED'",
+        }
+    ]
+    todos = (await sqlite_session.scalars(select(Todo))).all()
+    assert [(t.title, t.description) for t in todos] == [
+        ('One', 'first\nsecond "line"'),
+        ('Four', ''),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_csv_should_skip_byte_order_mark(sqlite_session):
+    data = 'title,description,state\nExcel,,NEW\n'.encode('utf-8-sig')
+
+    result = await import_todos(
+        sqlite_session, 1, _chunks(data, 2), 'csv', 100, 1
+    )
+
+    assert result == {'imported': 1, 'failed': 0, 'errors': []}
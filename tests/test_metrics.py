@@ -0,0 +1,144 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+
+from fastapi_zero import metrics as metrics_module
+from fastapi_zero.metrics import (
+    Exposition,
+    Histogram,
+    Metrics,
+    RequestStats,
+    parameter_shape,
+)
+from fastapi_zero.metrics import metrics as request_metrics
+
+
+@pytest.fixture
+def metrics_client(client):
+    request_metrics.clear()
+    yield client
+    request_metrics.clear()
+
+
+def _samples(text: str) -> dict[str, float]:
+    return {
+        line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+        for line in text.splitlines()
+        if not line.startswith('#')
+    }
+
+
+def test_histogram_buckets_should_be_cumulative():
+    histogram = Histogram((1, 5))
+    for value in (0.5, 1, 3, 7):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [('1', 2), ('5', 3), ('+Inf', 4)]
+    assert histogram.sum == 11.5  # noqa: PLR2004
+    assert histogram.count == 4  # noqa: PLR2004
+
+
+def test_exposition_should_type_stats_and_escape_labels():
+    exposition = Exposition()
+    exposition.stats(
+        'cache',
+        'A cache.',
+        {'route': 'a"b\\c'},
+        {'hits': 3, 'size': 2, 'wait_seconds_total': 0.5},
+    )
+
+    assert exposition.render().splitlines() == [
+        '# HELP cache_hits_total A cache.',
+        '# TYPE cache_hits_total counter',
+        'cache_hits_total{route="a\\"b\\\\c"} 3',
+        '# HELP cache_size A cache.',
+        '# TYPE cache_size gauge',
+        'cache_size{route="a\\"b\\\\c"} 2',
+        '# HELP cache_wait_seconds_total A cache.',
+        '# TYPE cache_wait_seconds_total counter',
+        'cache_wait_seconds_total{route="a\\"b\\\\c"} 0.5',
+    ]
+
+
+def test_metrics_should_record_requests_by_route_template(
+    metrics_client, user, token
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    for todo_id in (1, 2):
+        metrics_client.get(f'/todos/{todo_id}', headers=headers)
+    metrics_client.get('/nowhere')
+
+    response = metrics_client.get('/metrics')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['Content-Type'].startswith('text/plain')
+    samples = _samples(response.text)
+    route = 'method="GET",route="/todos/{todo_id}"'
+    assert samples[f'http_requests_total{{{route},status="404"}}'] == 2  # noqa: PLR2004
+    assert samples[f'http_request_duration_seconds_count{{{route}}}'] == 2  # noqa: PLR2004
+    # The principal is only loaded by the first request
+    assert samples[f'http_request_db_queries_sum{{{route}}}'] == 3  # noqa: PLR2004
+    assert samples[f'http_request_db_seconds_sum{{{route}}}'] > 0
+    assert (
+        samples[
+            'http_requests_total{method="GET",route="unmatched",status="404"}'
+        ]
+        == 1
+    )
+    assert 'principal_cache_hits_total' in samples
+    assert 'password_executor_active' in samples
+    assert 'db_recent_writers_evictions_total' in samples
+    assert 'route="/metrics"' not in response.text
+
+
+def test_parameter_shape_should_hide_values():
+    assert parameter_shape({'email': 'a@b.c', 'id': 1}) == (
+        '{email: str, id: int}'
+    )
+    assert parameter_shape(('secret', None)) == '(str, NoneType)'
+    assert parameter_shape([{'id': 1}, {'id': 2}]) == '2 x {id: int}'
+
+
+def test_slow_queries_should_be_logged_without_values(
+    metrics_client, user, token, monkeypatch, caplog
+):
+    monkeypatch.setattr(
+        metrics_module.settings, 'DATABASE_SLOW_QUERY_SECONDS', 0
+    )
+
+    with caplog.at_level(logging.WARNING, logger='fastapi_zero.metrics'):
+        metrics_client.get(
+            '/todos/1', headers={'Authorization': f'Bearer {token}'}
+        )
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(
+        message.startswith('Slow query') and 'parameters={' in message
+        for message in messages
+    )
+    assert not any(user.email in message for message in messages)
+
+
+def test_repeated_statements_should_be_flagged(caplog):
+    metrics = Metrics()
+    stats = RequestStats()
+    stats.statements['SELECT 1'] = 5
+    stats.statements['SELECT 2'] = 1
+
+    with caplog.at_level(logging.WARNING, logger='fastapi_zero.metrics'):
+        metrics.observe('GET', '/todos', 200, 0.1, stats)
+        metrics.observe('GET', '/todos', 200, 0.1, RequestStats())
+
+    assert [record.getMessage() for record in caplog.records] == [
+        'Possible N+1 in GET /todos: statement ran 5 times: SELECT 1'
+    ]
+    exposition = Exposition()
+    metrics_module.expose_requests(exposition, metrics)
+    samples = _samples(exposition.render())
+    assert (
+        samples[
+            'http_request_repeated_queries_total{method="GET",route="/todos"}'
+        ]
+        == 1
+    )
@@ -0,0 +1,40 @@
+import sqlite3
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+MIGRATIONS = Path(__file__).parents[1] / 'migrations'
+
+
+def _alembic(tmp_path, monkeypatch) -> Config:
+    monkeypatch.setenv(
+        'DATABASE_URL', f'sqlite+aiosqlite:///{tmp_path}/migrations.db'
+    )
+    config = Config()
+    config.set_main_option('script_location', str(MIGRATIONS))
+    return config
+
+
+def test_search_indexes_should_downgrade_on_sqlite(tmp_path, monkeypatch):
+    config = _alembic(tmp_path, monkeypatch)
+    command.upgrade(config, 'head')
+
+    command.downgrade(config, 'a3f9c2e7d184')
+
+    with sqlite3.connect(tmp_path / 'migrations.db') as connection:
+        assert not connection.execute(
+            "SELECT name FROM sqlite_master WHERE name LIKE 'todos_fts%'"
+        ).fetchall()
+        connection.execute(
+            'INSERT INTO users (username, email, password_hash) '
+            "VALUES ('alice', 'alice@test.com', 'x')"
+        )
+        connection.execute(
+            'INSERT INTO todos (title, description, state, user_id) '
+            "VALUES ('todo', '', 'NEW', 1)"
+        )
+        connection.execute("UPDATE todos SET title = 'updated'")
+        connection.execute('DELETE FROM todos')
+
+    command.upgrade(config, 'head')
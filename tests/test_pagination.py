@@ -0,0 +1,16 @@
+import pytest
+
+from fastapi_zero.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_should_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    'cursor',
+    ['', 'not-a-cursor', encode_cursor('42'), 'WzFd', 'eyJpZCI6dHJ1ZX0'],
+)
+def test_decode_invalid_cursor_should_raise(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor)
@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+
+from fastapi_zero.response_cache import CachedResponse, ResponseCache
+
+
+class FakeBackend:
+    """In-memory stand-in for an external backend that records the TTL of
+    every write."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl):
+        self.values[key] = value
+        self.ttls[key] = ttl
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+def _loader(body=b'{}'):
+    calls = []
+
+    async def load():
+        calls.append(body)
+        return CachedResponse(body, etag='"etag"')
+
+    return load, calls
+
+
+@pytest.mark.asyncio
+async def test_fetch_should_load_once_and_serve_hits_from_backend():
+    backend = FakeBackend()
+    cache = ResponseCache(backend)
+    load, calls = _loader(b'{"id":1}')
+
+    first = await cache.fetch('route', 'ns', 'key', 30, load)
+    second = await cache.fetch('route', 'ns', 'key', 30, load)
+
+    assert first == second == CachedResponse(b'{"id":1}', '"etag"')
+    assert len(calls) == 1
+    assert 30 in backend.ttls.values()  # noqa: PLR2004
+    assert cache.stats()['route']['hits'] == 1
+    assert cache.stats()['route']['misses'] == 1
+    assert cache.stats()['route']['hit_ratio'] == 0.5  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_invalidate_should_make_namespace_keys_unreachable():
+    cache = ResponseCache(FakeBackend())
+    load, calls = _loader()
+    await cache.fetch('route', 'ns', 'key', 30, load)
+    await cache.fetch('route', 'other', 'key', 30, load)
+
+    await cache.invalidate('ns')
+    await cache.fetch('route', 'ns', 'key', 30, load)
+    await cache.fetch('route', 'other', 'key', 30, load)
+
+    assert len(calls) == 3  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_fetch_should_not_cache_errors():
+    cache = ResponseCache(FakeBackend())
+
+    async def load():
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND)
+
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            await cache.fetch('route', 'ns', 'key', 30, load)
+
+    assert cache.stats()['route']['misses'] == 2  # noqa: PLR2004
+    assert cache.stats()['route']['hit_ratio'] == 0
+
+
+@pytest.mark.parametrize('etag', ['"etag"', None])
+def test_cached_response_should_round_trip(etag):
+    cached = CachedResponse(b'{"a":\n1}', etag)
+
+    assert CachedResponse.loads(cached.dumps()) == cached
+
+
+@pytest.mark.asyncio
+async def test_fetch_should_load_from_primary_after_invalidation():
+    cache = ResponseCache(FakeBackend(), read_your_writes_seconds=60)
+    load, calls = _loader(b'replica')
+    load_from_primary, primary_calls = _loader(b'primary')
+    await cache.fetch('route', 'ns', 'key', 30, load, load_from_primary)
+
+    await cache.invalidate('ns')
+    response = await cache.fetch(
+        'route', 'ns', 'key', 30, load, load_from_primary
+    )
+    cache.read_your_writes_seconds = 0
+    await cache.invalidate('ns')
+    await cache.fetch('route', 'ns', 'key', 30, load, load_from_primary)
+
+    assert response.body == b'primary'
+    assert len(calls) == 2  # noqa: PLR2004
+    assert len(primary_calls) == 1
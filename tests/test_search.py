@@ -0,0 +1,72 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, select, update
+
+from fastapi_zero.models import Todo, TodoState
+from fastapi_zero.search import search_todos
+
+
+@pytest_asyncio.fixture
+async def todos(sqlite_session):
+    todos = [
+        Todo(
+            title='Buy bread',
+            description='On the way home',
+            state=TodoState.NEW,
+            user_id=1,
+        ),
+        Todo(
+            title='Call mom',
+            description='Ask whether she needs milk',
+            state=TodoState.NEW,
+            user_id=1,
+        ),
+        Todo(
+            title='Buy milk',
+            description='Whole milk, two bottles of milk',
+            state=TodoState.NEW,
+            user_id=1,
+        ),
+    ]
+    sqlite_session.add_all(todos)
+    await sqlite_session.commit()
+    return todos
+
+
+async def _search_titles(session, terms):
+    todos = await session.scalars(
+        search_todos(select(Todo), terms, session.bind.dialect.name)
+    )
+    return [todo.title for todo in todos]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_search_should_rank_best_match_first(
+    sqlite_session, todos
+):
+    assert await _search_titles(sqlite_session, 'milk') == [
+        'Buy milk',
+        'Call mom',
+    ]
+    assert await _search_titles(sqlite_session, 'buy milk') == ['Buy milk']
+
+
+@pytest.mark.asyncio
+async def test_sqlite_search_should_quote_fts_syntax(sqlite_session, todos):
+    assert await _search_titles(sqlite_session, 'milk" OR "bread') == []
+    assert await _search_titles(sqlite_session, 'to buy milk') == ['Buy milk']
+
+
+@pytest.mark.asyncio
+async def test_sqlite_search_should_follow_updates_and_deletes(
+    sqlite_session, todos
+):
+    await sqlite_session.execute(
+        update(Todo).where(Todo.title == 'Buy bread').values(title='Buy eggs')
+    )
+    await sqlite_session.execute(delete(Todo).where(Todo.title == 'Buy milk'))
+    await sqlite_session.commit()
+
+    assert await _search_titles(sqlite_session, 'bread') == []
+    assert await _search_titles(sqlite_session, 'eggs') == ['Buy eggs']
+    assert await _search_titles(sqlite_session, 'milk') == ['Call mom']
@@ -1,8 +1,24 @@
 from http import HTTPStatus
 
+import pytest
 from jwt import decode
 
-from fastapi_zero.security import create_access_token
+from fastapi_zero.models import Todo, TodoState
+from fastapi_zero.security import (
+    Principal,
+    create_access_token,
+    password_hasher,
+    principal_cache,
+    verify_password,
+)
+
+
+def test_password_hasher_should_use_given_cost_and_verify_older_hashes():
+    hash = password_hasher(1, 8, 1).hash('secret')
+
+    assert '$m=8,t=1,p=1$' in hash
+    assert verify_password('secret', hash)
+    assert not verify_password('other', hash)
 
 
 def test_jwt(settings):
@@ -23,3 +39,150 @@ def test_jwt_invalid_token_should_return_401(client):
 
     assert response.status_code == HTTPStatus.UNAUTHORIZED
     assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_get_current_user_should_not_load_user_todos(
+    client, user, token, count_queries
+):
+    with count_queries() as queries:
+        response = client.post(
+            '/auth/refresh_token',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == 1
+    assert 'todos' not in queries[0]
+    assert 'password_hash' not in queries[0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('method', 'path', 'json', 'expected_queries'),
+    [
+        ('post', '/auth/refresh_token', None, 1),
+        ('post', '/todos/', {'title': 'Todo', 'description': 'Todo'}, 2),
+        ('get', '/todos/', None, 2),
+        ('get', '/todos/{todo_id}', None, 2),
+        ('put', '/todos/{todo_id}', {'title': 'Updated'}, 2),
+        ('delete', '/todos/{todo_id}', None, 2),
+        (
+            'put',
+            '/users/{user_id}',
+            {'username': 'updated', 'email': 'updated@test.com'},
+            2,
+        ),
+        ('delete', '/users/{user_id}', None, 3),
+    ],
+)
+async def test_authenticated_routes_query_count(  # noqa: PLR0913, PLR0917
+    client,
+    session,
+    user,
+    token,
+    count_queries,
+    method,
+    path,
+    json,
+    expected_queries,
+):
+    todo = Todo(
+        title='Todo', description='Todo', state=TodoState.NEW, user_id=user.id
+    )
+    session.add(todo)
+    await session.commit()
+
+    with count_queries() as queries:
+        response = client.request(
+            method,
+            path.format(todo_id=todo.id, user_id=user.id),
+            headers={'Authorization': f'Bearer {token}'},
+            json=json,
+        )
+
+    assert response.status_code < HTTPStatus.BAD_REQUEST
+    assert len(queries) == expected_queries
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('method', 'path', 'json'),
+    [
+        (
+            'put',
+            '/users/{user_id}',
+            {'username': 'updated', 'email': 'updated@test.com'},
+        ),
+        (
+            'post',
+            '/todos/',
+            {'title': 'Todo', 'description': 'Todo', 'state': 'NEW'},
+        ),
+        ('put', '/todos/{todo_id}', {'title': 'Updated'}),
+        ('delete', '/todos/{todo_id}', None),
+    ],
+)
+async def test_write_routes_should_take_one_statement(  # noqa: PLR0913, PLR0917
+    client, session, user, token, count_queries, method, path, json
+):
+    todo = Todo(
+        title='Todo', description='Todo', state=TodoState.NEW, user_id=user.id
+    )
+    session.add(todo)
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/auth/refresh_token', headers=headers)
+
+    with count_queries() as queries:
+        response = client.request(
+            method,
+            path.format(todo_id=todo.id, user_id=user.id),
+            headers=headers,
+            json=json,
+        )
+
+    assert response.status_code < HTTPStatus.BAD_REQUEST
+    assert len(queries) == 1, queries
+
+
+def test_get_current_user_should_cache_principal(
+    client, user, token, count_queries
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/auth/refresh_token', headers=headers)
+
+    with count_queries() as queries:
+        response = client.post('/auth/refresh_token', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert queries == []
+    assert principal_cache.get(user.email) == Principal(
+        id=user.id, username=user.username, email=user.email
+    )
+
+
+def test_update_user_should_invalidate_cached_principal(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/auth/refresh_token', headers=headers)
+
+    response = client.put(
+        f'/users/{user.id}',
+        headers=headers,
+        json={'username': user.username, 'email': 'changed@test.com'},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert user.email not in principal_cache
+
+    response = client.post('/auth/refresh_token', headers=headers)
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_delete_user_should_invalidate_cached_principal(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/auth/refresh_token', headers=headers)
+
+    response = client.delete(f'/users/{user.id}', headers=headers)
+    assert response.status_code == HTTPStatus.NO_CONTENT
+
+    response = client.post('/auth/refresh_token', headers=headers)
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
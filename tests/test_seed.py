@@ -0,0 +1,53 @@
+import random
+from statistics import median
+
+import pytest
+from sqlalchemy import func, select
+
+from fastapi_zero.models import Todo, TodoState, TodoStats, User
+from fastapi_zero.security import verify_password
+from fastapi_zero.seed import seed, todo_counts
+
+
+def test_todo_counts_should_be_skewed():
+    counts = todo_counts(1_000, 20, 1.0, random.Random(0))
+
+    assert len(counts) == 1_000  # noqa: PLR2004
+    assert sum(counts) == pytest.approx(20_000, rel=0.01)
+    assert max(counts) > 100 * median(counts)
+    assert counts == todo_counts(1_000, 20, 1.0, random.Random(0))
+
+
+@pytest.mark.asyncio
+async def test_seed_should_insert_users_and_todos(dialect_session):
+    session = dialect_session
+    users, todos = await seed(
+        session,
+        users=30,
+        todos_per_user=5,
+        skew=1.0,
+        password='secret',
+        batch_size=7,
+        rng=random.Random(0),
+    )
+
+    assert users == 30  # noqa: PLR2004
+    assert await session.scalar(select(func.count()).select_from(Todo)) == (
+        todos
+    )
+    hashes = (
+        await session.scalars(
+            select(User.password_hash)
+            .where(User.username.startswith('seed'))
+            .distinct()
+        )
+    ).all()
+    assert len(hashes) == 1
+    assert verify_password('secret', hashes[0])
+
+    assert await session.scalar(select(func.sum(TodoStats.count))) == todos
+    states = await session.scalars(select(Todo.state).distinct())
+    assert set(states) == set(TodoState)
+    assert not await session.scalar(
+        select(func.count()).where(Todo.updated_at < Todo.created_at)
+    )
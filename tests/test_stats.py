@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import delete, func, insert, select, update
+
+from fastapi_zero.models import Todo, TodoState, TodoStats
+from fastapi_zero.stats import rebuild_todo_stats
+
+
+async def _counters(session) -> dict:
+    rows = await session.execute(
+        select(TodoStats.user_id, TodoStats.state, TodoStats.count).where(
+            TodoStats.count != 0
+        )
+    )
+    return {(user_id, state): count for user_id, state, count in rows}
+
+
+async def _recount(session) -> dict:
+    rows = await session.execute(
+        select(Todo.user_id, Todo.state, func.count()).group_by(
+            Todo.user_id, Todo.state
+        )
+    )
+    return {(user_id, state): count for user_id, state, count in rows}
+
+
+@pytest.mark.asyncio
+async def test_todo_stats_should_follow_writes(dialect_session):
+    session, user_id = dialect_session, 1
+    await session.execute(
+        insert(Todo),
+        [
+            {
+                'title': f'Todo {i}',
+                'description': '',
+                'state': state,
+                'user_id': user_id,
+            }
+            for i, state in enumerate(
+                [TodoState.NEW] * 3 + [TodoState.DONE] * 2
+            )
+        ],
+    )
+    assert await _counters(session) == {
+        (user_id, TodoState.NEW): 3,
+        (user_id, TodoState.DONE): 2,
+    }
+
+    await session.execute(
+        update(Todo)
+        .where(Todo.title.in_(['Todo 0', 'Todo 1']))
+        .values(state=TodoState.ARCHIVED)
+    )
+    await session.execute(update(Todo).values(title='Renamed'))
+    await session.execute(delete(Todo).where(Todo.state == TodoState.DONE))
+    await session.commit()
+
+    assert await _counters(session) == {
+        (user_id, TodoState.NEW): 1,
+        (user_id, TodoState.ARCHIVED): 2,
+    }
+    assert await _counters(session) == await _recount(session)
+
+
+@pytest.mark.asyncio
+async def test_rebuild_todo_stats_should_restore_counters(
+    session, user, other_user
+):
+    session.add_all([
+        Todo(title='a', description='', state='NEW', user_id=user.id),
+        Todo(title='b', description='', state='DONE', user_id=user.id),
+        Todo(title='c', description='', state='NEW', user_id=other_user.id),
+    ])
+    await session.commit()
+    expected = await _recount(session)
+    await session.execute(update(TodoStats).values(count=42))
+
+    assert await rebuild_todo_stats(session, user.id) == 2  # noqa: PLR2004
+    assert await _counters(session) == {
+        **expected,
+        (other_user.id, TodoState.NEW): 42,
+    }
+
+    assert await rebuild_todo_stats(session) == 3  # noqa: PLR2004
+    await session.commit()
+    assert await _counters(session) == expected
@@ -1,9 +1,18 @@
+import csv
+import io
+import json
 from http import HTTPStatus
 
 import factory.fuzzy
 import pytest
 
 from fastapi_zero.models import Todo, TodoState
+from fastapi_zero.pagination import encode_cursor
+from fastapi_zero.response_cache import response_cache
+from fastapi_zero.routers import todos
+from fastapi_zero.security import create_access_token
+
+pytestmark = pytest.mark.query_budget(3)
 
 
 class TodoFactory(factory.Factory):
@@ -66,6 +75,59 @@ async def test_list_todos_should_return_5_todos(session, client, user, token):
     assert len(response.json()['todos']) == expected_todos
 
 
+@pytest.mark.asyncio
+async def test_list_todos_should_not_load_entities(
+    session, client, user, token
+):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+    session.expunge_all()
+
+    response = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert len(response.json()['todos']) == 3  # noqa: PLR2004
+    assert not session.identity_map
+
+
+@pytest.mark.asyncio
+async def test_list_todos_with_cursor_should_walk_all_pages(
+    session, client, user, token
+):
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+
+    ids = []
+    cursor = None
+    for _ in range(3):
+        params = {'limit': 2, 'cursor': cursor} if cursor else {'limit': 2}
+        response = client.get(
+            '/todos',
+            params=params,
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        data = response.json()
+        ids += [todo['id'] for todo in data['todos']]
+        cursor = data['next_cursor']
+
+    assert ids == [1, 2, 3, 4, 5]
+    assert cursor is None
+
+
+@pytest.mark.asyncio
+async def test_list_todos_with_skip_and_cursor_should_return_422(
+    client, token
+):
+    response = client.get(
+        '/todos',
+        params={'skip': 1, 'cursor': encode_cursor(1)},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.asyncio
 async def test_list_todos_filter_title_should_return_5_records(
     session, user, client, token
@@ -158,6 +220,212 @@ async def test_list_todos_filter_combined_should_return_5_todos(
     assert len(response.json()['todos']) == expected_todos
 
 
+@pytest.mark.asyncio
+async def test_list_todos_search_should_rank_best_match_first(
+    session, user, client, token
+):
+    session.add_all([
+        Todo(
+            title='Buy bread',
+            description='On the way home',
+            state=TodoState.NEW,
+            user_id=user.id,
+        ),
+        Todo(
+            title='Buy milk',
+            description='Whole milk, two bottles of milk',
+            state=TodoState.NEW,
+            user_id=user.id,
+        ),
+        Todo(
+            title='Walk the dog',
+            description='Around the park',
+            state=TodoState.NEW,
+            user_id=user.id,
+        ),
+    ])
+    await session.commit()
+
+    response = client.get(
+        '/todos?q=milk buy',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [todo['title'] for todo in response.json()['todos']] == ['Buy milk']
+
+    response = client.get(
+        '/todos?q=buy',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert [todo['title'] for todo in response.json()['todos']] == [
+        'Buy bread',
+        'Buy milk',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_list_todos_search_with_state_and_skip_should_return_1_todo(
+    session, user, other_user, client, token
+):
+    session.add_all(
+        TodoFactory.create_batch(
+            3, user_id=user.id, title='Report', state=TodoState.DONE
+        )
+    )
+    session.add_all(
+        TodoFactory.create_batch(
+            2, user_id=user.id, title='Report', state=TodoState.PENDING
+        )
+    )
+    session.add_all(
+        TodoFactory.create_batch(
+            2, user_id=other_user.id, title='Report', state=TodoState.DONE
+        )
+    )
+    await session.commit()
+
+    response = client.get(
+        '/todos?q=report&state=DONE&skip=2&limit=10',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert len(response.json()['todos']) == 1
+    assert response.json()['next_cursor'] is None
+
+
+@pytest.mark.asyncio
+async def test_list_todos_search_with_cursor_should_return_422(client, token):
+    response = client.get(
+        '/todos',
+        params={'q': 'report', 'cursor': encode_cursor(1)},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('format', 'media_type'),
+    [('ndjson', 'application/x-ndjson'), ('csv', 'text/csv')],
+)
+async def test_export_todos_should_stream_own_todos(  # noqa: PLR0913, PLR0917
+    client, session, user, other_user, token, format, media_type
+):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    session.add(TodoFactory(user_id=other_user.id))
+    await session.commit()
+
+    response = client.get(
+        f'/todos/export?format={format}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith(media_type)
+    assert response.headers['content-disposition'] == (
+        f'attachment; filename="todos.{format}"'
+    )
+    if format == 'csv':
+        rows = list(csv.reader(io.StringIO(response.text)))[1:]
+    else:
+        rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 3  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_import_todos_should_round_trip_an_export(
+    client, session, user, token
+):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    exported = client.get('/todos/export?format=csv', headers=headers)
+
+    response = client.post(
+        '/todos/import?format=csv',
+        headers={**headers, 'Content-Type': 'text/csv'},
+        content=exported.content + b'Broken,,NOPE\n',
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['imported'] == 3  # noqa: PLR2004
+    assert response.json()['failed'] == 1
+    todos = client.get('/todos/?limit=10', headers=headers).json()['todos']
+    assert len(todos) == 6  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_todo_stats_should_follow_every_write_path(  # noqa: PLR0913, PLR0917
+    client, session, user, other_user, token, count_queries
+):
+    session.add(TodoFactory(user_id=other_user.id, state=TodoState.NEW))
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    first = client.post(
+        '/todos/',
+        headers=headers,
+        json={'title': 'a', 'description': 'a', 'state': 'NEW'},
+    ).json()
+    batch = client.post(
+        '/todos/batch',
+        headers=headers,
+        json={
+            'create': [
+                {'title': 'b', 'description': 'b', 'state': 'DONE'},
+                {'title': 'c', 'description': 'c', 'state': 'PENDING'},
+            ],
+            'update': [{'id': first['id'], 'state': 'IN_PROGRESS'}],
+        },
+    ).json()
+    client.post(
+        '/todos/import',
+        headers=headers,
+        content=b'{"title": "d", "state": "DONE"}\n',
+    )
+    done_id = batch['create'][0]['id']
+    client.put(f'/todos/{done_id}', headers=headers, json={'state': 'NEW'})
+    client.delete(f'/todos/{batch["create"][1]["id"]}', headers=headers)
+
+    with count_queries() as queries:
+        response = client.get('/todos/stats', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'total': 3,
+        'states': {
+            'NEW': 1,
+            'PENDING': 0,
+            'IN_PROGRESS': 1,
+            'DONE': 1,
+            'ARCHIVED': 0,
+        },
+    }
+    assert len(queries) == 1
+
+
+def test_import_todos_with_invalid_encoding_should_return_400(client, token):
+    response = client.post(
+        '/todos/import',
+        headers={'Authorization': f'Bearer {token}'},
+        content=b'{"title": "\xff"}\n',
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Upload must be UTF-8 encoded'}
+
+
+def test_export_todos_with_unknown_format_should_return_422(client, token):
+    response = client.get(
+        '/todos/export?format=xml',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.asyncio
 async def test_find_todo_should_return_200(client, session, user, token):
     todo = TodoFactory(user_id=user.id)
@@ -201,6 +469,139 @@ async def test_find_todo_not_owned_should_return_403(
     assert response.json() == {'detail': 'Not authorized to access this todo'}
 
 
+@pytest.mark.asyncio
+async def test_find_todo_with_matching_etag_should_return_304(
+    client, session, user, token, count_queries
+):
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get(f'/todos/{todo.id}', headers=headers).headers['ETag']
+
+    with count_queries() as queries:
+        response = client.get(
+            f'/todos/{todo.id}', headers={**headers, 'If-None-Match': etag}
+        )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+    assert not response.content
+    assert len(queries) == 1
+    assert 'description' not in queries[0]
+
+
+@pytest.mark.asyncio
+async def test_find_todo_etag_should_change_after_update(
+    client, session, user, token
+):
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get(f'/todos/{todo.id}', headers=headers).headers['ETag']
+    client.put(f'/todos/{todo.id}', headers=headers, json={'title': 'New'})
+
+    response = client.get(
+        f'/todos/{todo.id}', headers={**headers, 'If-None-Match': etag}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] != etag
+    assert response.json()['title'] == 'New'
+
+
+@pytest.mark.asyncio
+async def test_list_todos_should_be_cached_per_user(  # noqa: PLR0913, PLR0917
+    client, session, user, other_user, token, count_queries
+):
+    session.add_all(TodoFactory.create_batch(2, user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    other_token = create_access_token({'sub': other_user.email})
+    other_headers = {'Authorization': f'Bearer {other_token}'}
+    first = client.get('/todos/?limit=1', headers=headers)
+    client.post(
+        '/todos/',
+        headers=other_headers,
+        json={'title': 'Other', 'description': 'Other', 'state': 'NEW'},
+    )
+
+    with count_queries() as queries:
+        cached = client.get('/todos/?limit=1', headers=headers)
+
+    assert queries == []
+    assert cached.json() == first.json()
+    assert cached.headers['ETag'] == first.headers['ETag']
+
+
+@pytest.mark.asyncio
+async def test_list_todos_with_matching_etag_should_return_304(
+    client, session, user, token
+):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get('/todos/', headers=headers).headers['ETag']
+
+    not_modified = client.get(
+        '/todos/', headers={**headers, 'If-None-Match': etag}
+    )
+    client.post(
+        '/todos/',
+        headers=headers,
+        json={'title': 'New', 'description': 'New', 'state': 'NEW'},
+    )
+    modified = client.get(
+        '/todos/', headers={**headers, 'If-None-Match': etag}
+    )
+
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert modified.status_code == HTTPStatus.OK
+    assert len(modified.json()['todos']) == 4  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_list_todos_etag_should_ignore_the_next_page(
+    client, session, user, token
+):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get('/todos/?limit=2', headers=headers).headers['ETag']
+
+    client.put('/todos/3', headers=headers, json={'title': 'Next page'})
+    unchanged = client.get('/todos/?limit=2', headers=headers)
+    client.delete('/todos/3', headers=headers)
+    last_page = client.get('/todos/?limit=2', headers=headers)
+
+    assert unchanged.headers['ETag'] == etag
+    assert last_page.json()['next_cursor'] is None
+    assert last_page.headers['ETag'] != etag
+
+
+@pytest.mark.asyncio
+async def test_fast_json_responses_should_match_default_bodies(  # noqa: PLR0913, PLR0917
+    client, session, user, token, monkeypatch
+):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    session.add(Todo(title='Café ☕', description='', state='NEW', user_id=1))
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    urls = ['/todos/?limit=2', '/todos/?q=Café', '/todos/4']
+    default = [client.get(url, headers=headers) for url in urls]
+
+    await response_cache.invalidate(f'todos:{user.id}')
+    monkeypatch.setattr(todos.settings, 'FAST_JSON_RESPONSES', True)
+    fast = [client.get(url, headers=headers) for url in urls]
+
+    for expected, response in zip(default, fast):
+        assert response.status_code == HTTPStatus.OK
+        assert response.content == expected.content
+        assert response.headers['ETag'] == expected.headers['ETag']
+        assert response.headers['Content-Type'] == 'application/json'
+
+
 @pytest.mark.asyncio
 async def test_update_todo_should_return_200(client, session, user, token):
     todo = TodoFactory(user_id=user.id)
@@ -219,6 +620,90 @@ async def test_update_todo_should_return_200(client, session, user, token):
     assert response.json()['title'] == 'Updated Todo'
 
 
+@pytest.mark.asyncio
+async def test_update_todo_without_fields_should_return_unchanged_todo(
+    client, session, user, token
+):
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+
+    response = client.put(
+        f'/todos/{todo.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['title'] == todo.title
+
+
+@pytest.mark.asyncio
+async def test_update_todo_with_current_if_match_should_bump_version(
+    client, session, user, token
+):
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get(f'/todos/{todo.id}', headers=headers).headers['ETag']
+
+    response = client.put(
+        f'/todos/{todo.id}',
+        headers={**headers, 'If-Match': etag},
+        json={'title': 'Updated'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert etag == '"1"'
+    assert response.headers['ETag'] == '"2"'
+
+
+@pytest.mark.asyncio
+async def test_update_todo_with_stale_if_match_should_return_412(
+    client, session, user, token
+):
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get(f'/todos/{todo.id}', headers=headers).headers['ETag']
+    client.put(
+        f'/todos/{todo.id}',
+        headers={**headers, 'If-Match': etag},
+        json={'title': 'First writer'},
+    )
+
+    response = client.put(
+        f'/todos/{todo.id}',
+        headers={**headers, 'If-Match': etag},
+        json={'title': 'Second writer'},
+    )
+
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+    assert response.json() == {
+        'detail': 'Todo was modified by another request'
+    }
+    current = client.get(f'/todos/{todo.id}', headers=headers).json()
+    assert current['title'] == 'First writer'
+
+
+@pytest.mark.asyncio
+async def test_update_todo_with_if_match_not_owned_should_return_403(
+    client, session, other_user, token
+):
+    todo = TodoFactory(user_id=other_user.id)
+    session.add(todo)
+    await session.commit()
+
+    response = client.put(
+        f'/todos/{todo.id}',
+        headers={'Authorization': f'Bearer {token}', 'If-Match': '"1"'},
+        json={'title': 'Updated'},
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
 @pytest.mark.asyncio
 async def test_update_todo_not_found_should_return_404(client, token):
     input = {
@@ -289,6 +774,22 @@ async def test_delete_todo_should_return_204(client, session, user, token):
     assert response.status_code == HTTPStatus.NO_CONTENT
 
 
+@pytest.mark.asyncio
+async def test_delete_todo_with_stale_if_match_should_return_412(
+    client, session, user, token
+):
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+
+    response = client.delete(
+        f'/todos/{todo.id}',
+        headers={'Authorization': f'Bearer {token}', 'If-Match': '"7"'},
+    )
+
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+
+
 @pytest.mark.asyncio
 async def test_delete_todo_not_found_should_return_404(client, token):
     response = client.delete(
@@ -313,3 +814,169 @@ async def test_delete_todo_not_owned_should_return_403(
     )
     assert response.status_code == HTTPStatus.FORBIDDEN
     assert response.json() == {'detail': 'Not authorized to delete this todo'}
+
+
+# One statement per operation kind, plus lookups for the ids that missed
+@pytest.mark.query_budget(6)
+@pytest.mark.asyncio
+async def test_batch_todos_should_return_result_per_item(  # noqa: PLR0913, PLR0917
+    client, session, user, other_user, token, count_queries
+):
+    own = TodoFactory.create_batch(3, user_id=user.id, state=TodoState.NEW)
+    others = TodoFactory(user_id=other_user.id)
+    session.add_all([*own, others])
+    await session.commit()
+
+    with count_queries() as queries:
+        response = client.post(
+            '/todos/batch',
+            headers={'Authorization': f'Bearer {token}'},
+            json={
+                'create': [
+                    {'title': 'First', 'description': 'a'},
+                    {'title': 'Second', 'description': 'b', 'state': 'DONE'},
+                ],
+                'update': [
+                    {'id': own[0].id, 'title': 'Renamed'},
+                    {'id': own[1].id, 'state': 'DONE'},
+                    {'id': others.id, 'title': 'Hijacked'},
+                ],
+                'delete': [own[2].id, 999],
+            },
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert [(r['status'], r['todo']['title']) for r in data['create']] == [
+        (HTTPStatus.CREATED, 'First'),
+        (HTTPStatus.CREATED, 'Second'),
+    ]
+    assert [r['status'] for r in data['update']] == [
+        HTTPStatus.OK,
+        HTTPStatus.OK,
+        HTTPStatus.FORBIDDEN,
+    ]
+    assert data['update'][0]['todo']['title'] == 'Renamed'
+    assert data['update'][0]['todo']['state'] == own[0].state
+    assert data['update'][1]['todo']['title'] == own[1].title
+    assert data['update'][1]['todo']['state'] == 'DONE'
+    assert data['update'][2]['detail'] == 'Not authorized to update this todo'
+    assert data['delete'] == [
+        {
+            'id': own[2].id,
+            'status': HTTPStatus.NO_CONTENT,
+            'todo': None,
+            'detail': None,
+        },
+        {
+            'id': 999,
+            'status': HTTPStatus.NOT_FOUND,
+            'todo': None,
+            'detail': 'Todo not found',
+        },
+    ]
+    # auth, insert, update, delete and one lookup per operation with misses
+    assert len(queries) == 6  # noqa: PLR2004
+
+    await session.refresh(others)
+    assert others.title != 'Hijacked'
+
+
+@pytest.mark.asyncio
+async def test_batch_todos_with_duplicate_ids_should_return_422(client, token):
+    response = client.post(
+        '/todos/batch',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'delete': [1, 1]},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_batch_todos_empty_should_not_query(
+    client, token, count_queries
+):
+    with count_queries() as queries:
+        response = client.post(
+            '/todos/batch',
+            headers={'Authorization': f'Bearer {token}'},
+            json={},
+        )
+
+    assert response.json() == {'create': [], 'update': [], 'delete': []}
+    assert len(queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_todos_update_without_fields_should_return_200(
+    client, session, user, token
+):
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+
+    response = client.post(
+        '/todos/batch',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'update': [{'id': todo.id}]},
+    )
+
+    [result] = response.json()['update']
+    assert result['status'] == HTTPStatus.OK
+    assert result['todo']['title'] == todo.title
+    await session.refresh(todo)
+    assert todo.version == 1
+
+
+# Update, read back of the item without fields, lookup of the misses
+@pytest.mark.query_budget(4)
+@pytest.mark.asyncio
+async def test_batch_todos_update_with_stale_version_should_return_412(
+    client, session, user, token
+):
+    todos = TodoFactory.create_batch(3, user_id=user.id)
+    session.add_all(todos)
+    await session.commit()
+
+    response = client.post(
+        '/todos/batch',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'update': [
+                {'id': todos[0].id, 'version': 1, 'title': 'Current'},
+                {'id': todos[1].id, 'version': 2, 'title': 'Stale'},
+                {'id': todos[2].id, 'version': 2},
+            ]
+        },
+    )
+
+    assert [(r['status'], r['detail']) for r in response.json()['update']] == [
+        (HTTPStatus.OK, None),
+        (
+            HTTPStatus.PRECONDITION_FAILED,
+            'Todo was modified by another request',
+        ),
+        (
+            HTTPStatus.PRECONDITION_FAILED,
+            'Todo was modified by another request',
+        ),
+    ]
+    await session.refresh(todos[1])
+    assert todos[1].title != 'Stale'
+
+
+@pytest.mark.asyncio
+async def test_batch_todos_create_with_null_description_should_return_201(
+    client, token
+):
+    response = client.post(
+        '/todos/batch',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'create': [{'title': 'No description', 'description': None}]},
+    )
+
+    [result] = response.json()['create']
+    assert result['status'] == HTTPStatus.CREATED
+    todo = result['todo']
+    assert (todo['title'], todo['description']) == ('No description', '')
@@ -1,8 +1,14 @@
 from http import HTTPStatus
 
+import pytest
+
+from fastapi_zero.response_cache import MemoryBackend
+from fastapi_zero.routers import users
 from fastapi_zero.schemas import UserResponse
 from fastapi_zero.security import create_access_token
 
+pytestmark = pytest.mark.query_budget(3)
+
 
 def test_create_user_should_return_201(client):
     input = {
@@ -41,6 +47,46 @@ def test_create_user_email_conflict_should_return_409(client, user):
     assert response.json() == {'detail': 'Email already registered'}
 
 
+def test_create_user_conflict_should_not_hash_password(
+    client, user, monkeypatch
+):
+    async def get_password_hash_async(password):
+        pytest.fail('hashed the password of a duplicate sign-up')
+
+    monkeypatch.setattr(
+        users, 'get_password_hash_async', get_password_hash_async
+    )
+    input = {
+        'username': user.username,
+        'email': user.email,
+        'password': 'securepassword',
+    }
+    response = client.post('/users/', json=input)
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
+def test_create_user_losing_race_should_return_409(client, user, monkeypatch):
+    check_conflict = users._check_conflict
+    checks = []
+
+    async def raced_check_conflict(session, input):
+        # The concurrent sign-up commits right after the first check.
+        checks.append(input)
+        if len(checks) > 1:
+            await check_conflict(session, input)
+
+    monkeypatch.setattr(users, '_check_conflict', raced_check_conflict)
+    input = {
+        'username': 'newtestuser',
+        'email': user.email,
+        'password': 'securepassword',
+    }
+    response = client.post('/users/', json=input)
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json() == {'detail': 'Email already registered'}
+    assert len(checks) == 2  # noqa: PLR2004
+
+
 def test_find_user_should_return_200(client, user):
     expected_user = UserResponse.model_validate(user).model_dump()
     response = client.get(f'/users/{user.id}')
@@ -48,6 +94,31 @@ def test_find_user_should_return_200(client, user):
     assert response.json() == expected_user
 
 
+def test_find_user_with_matching_etag_should_return_304(client, user):
+    etag = client.get(f'/users/{user.id}').headers['ETag']
+
+    response = client.get(f'/users/{user.id}', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+
+
+def test_update_user_should_change_etag_within_the_same_second(
+    client, user, token
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    etags = [client.get(f'/users/{user.id}').headers['ETag']]
+    for username in ('first', 'second'):
+        client.put(
+            f'/users/{user.id}',
+            json={'username': username, 'email': user.email},
+            headers=headers,
+        )
+        etags.append(client.get(f'/users/{user.id}').headers['ETag'])
+
+    assert etags == ['"1"', '"2"', '"3"']
+
+
 def test_find_nonexistent_user_should_return_404(client):
     response = client.get('/users/999')
     assert response.status_code == HTTPStatus.NOT_FOUND
@@ -58,7 +129,86 @@ def test_list_users_should_return_200(client, user):
     expected_user = UserResponse.model_validate(user).model_dump()
     response = client.get('/users/')
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'users': [expected_user]}
+    assert response.json() == {'users': [expected_user], 'next_cursor': None}
+
+
+@pytest.mark.asyncio
+async def test_list_users_should_not_load_entities(client, session, user):
+    session.expunge_all()
+
+    response = client.get('/users/')
+
+    assert response.json()['users'] == [
+        {'id': user.id, 'username': user.username, 'email': user.email}
+    ]
+    assert not session.identity_map
+
+
+def test_find_user_should_be_served_from_cache(client, user, count_queries):
+    client.get(f'/users/{user.id}')
+
+    with count_queries() as queries:
+        response = client.get(f'/users/{user.id}')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['username'] == user.username
+    assert queries == []
+
+
+def test_user_writes_should_invalidate_cached_responses(client, user, token):
+    client.get('/users/')
+    client.get(f'/users/{user.id}')
+
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'renamed', 'email': user.email},
+    )
+    client.post(
+        '/users/',
+        json={'username': 'new', 'email': 'new@test.com', 'password': 'x'},
+    )
+
+    assert client.get(f'/users/{user.id}').json()['username'] == 'renamed'
+    assert [u['username'] for u in client.get('/users/').json()['users']] == [
+        'renamed',
+        'new',
+    ]
+
+
+def test_fast_json_responses_should_match_default_bodies(
+    client, user, other_user, monkeypatch
+):
+    urls = ['/users/?limit=1', f'/users/{user.id}']
+    default = [client.get(url) for url in urls]
+
+    monkeypatch.setattr(users.settings, 'FAST_JSON_RESPONSES', True)
+    monkeypatch.setattr(users.response_cache, 'backend', MemoryBackend(10))
+    fast = [client.get(url) for url in urls]
+
+    for expected, response in zip(default, fast):
+        assert response.status_code == HTTPStatus.OK
+        assert response.content == expected.content
+        assert response.headers.get('ETag') == expected.headers.get('ETag')
+
+
+def test_list_users_with_cursor_should_return_next_page(
+    client, user, other_user
+):
+    response = client.get('/users/?limit=1')
+    data = response.json()
+    assert [u['id'] for u in data['users']] == [user.id]
+    assert data['next_cursor']
+
+    response = client.get(f'/users/?limit=1&cursor={data["next_cursor"]}')
+    data = response.json()
+    assert [u['id'] for u in data['users']] == [other_user.id]
+    assert data['next_cursor'] is None
+
+
+def test_list_users_with_invalid_cursor_should_return_422(client):
+    response = client.get('/users/?cursor=not-a-cursor')
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
 
 
 def test_update_user_should_return_200(client, user, token):
@@ -142,3 +292,22 @@ def test_delete_user_wrong_user_should_return_403(client, other_user, token):
     )
     assert response.status_code == HTTPStatus.FORBIDDEN
     assert response.json() == {'detail': 'Not authorized to delete this user'}
+
+
+def test_update_user_password_should_allow_login(client, user, token):
+    response = client.put(
+        f'/users/{user.id}',
+        json={
+            'username': user.username,
+            'email': user.email,
+            'password': 'newsecurepassword',
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    response = client.post(
+        '/auth/login',
+        data={'username': user.email, 'password': 'newsecurepassword'},
+    )
+    assert response.status_code == HTTPStatus.OK